@@ -1,11 +1,22 @@
-from fastapi import FastAPI
+import time
+
+STARTED_AT = time.perf_counter()  # before the app imports, for the startup timings
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import os
 
-from app.routes import auth, analyze, admin
+from app.routes import auth, analyze, admin, jobs, scans
 from app.models.db import init_db
+from app.ml_core.registry import model_registry
+from app.services.jobs import job_runner
+from app.services.metrics import registry as metrics_registry
 from app.utils.config import settings
 from fastapi.staticfiles import StaticFiles
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 
@@ -35,12 +46,32 @@ app.add_middleware(
 )
 
 
+# ---------------------------------------------------
+# EARLY UPLOAD SIZE CHECK
+# ---------------------------------------------------
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Refuse bodies that announce a size above the largest upload limit before
+    they are read. Per-type limits are enforced again while streaming.
+    """
+    length = request.headers.get("content-length")
+    max_mb = max(
+        settings.MAX_VIDEO_SIZE_MB, settings.MAX_IMAGE_SIZE_MB, settings.MAX_AUDIO_SIZE_MB, settings.MAX_BATCH_SIZE_MB
+    )
+    if length and length.isdigit() and int(length) > max_mb * 1024 * 1024 + 64 * 1024:  # multipart overhead
+        return JSONResponse(status_code=413, content={"detail": f"Upload too large, limit is {max_mb} MB"})
+    return await call_next(request)
+
+
 # ---------------------------------------------------
 # ROUTE REGISTRATION
 # ---------------------------------------------------
 app.include_router(auth.router)
 app.include_router(analyze.router)
 app.include_router(admin.router)
+app.include_router(jobs.router)
+app.include_router(scans.router)
 
 
 # ---------------------------------------------------
@@ -51,7 +82,20 @@ def on_startup():
     """Initialize database and directories."""
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     init_db()
-    print("🔥 CyberShield backend started successfully!")
+    job_runner.start()
+
+    # Models load after the server is up unless asked to block; "lazy" waits for the first request or /ready probe
+    if settings.MODEL_PRELOAD in ("background", "blocking"):
+        model_registry.start(background=settings.MODEL_PRELOAD == "background")
+
+    app.state.startup_seconds = round(time.perf_counter() - STARTED_AT, 3)
+    logger.info("CyberShield backend started in %ss", app.state.startup_seconds)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Stop dispatching jobs; queued ones resume on the next start."""
+    job_runner.stop()
 
 
 # ---------------------------------------------------
@@ -69,8 +113,42 @@ def health_check():
         "service": "CyberShield Deepfake Detector",
         "model": settings.HF_DEEPFAKE_MODEL,
         "upload_dir": settings.UPLOAD_DIR,
+        "models": {name: m["state"] for name, m in model_registry.status().items()},
     }
 
+
+@app.get("/ready", tags=["system"])
+def readiness_check():
+    """
+    Readiness probe: 503 until every model is loaded and warmed (or when one
+    failed to load), 200 once the backend can score requests without waiting
+    on a cold load. With MODEL_PRELOAD=lazy the first probe starts the load in
+    the background, so traffic routed here afterwards does not pay for it.
+    """
+    pending = model_registry.not_loaded()
+    if pending:
+        model_registry.start(pending)
+    ready = model_registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "startup_seconds": getattr(app.state, "startup_seconds", None),
+            "uptime_seconds": round(time.perf_counter() - STARTED_AT, 3),
+            "models": model_registry.status(),
+        },
+    )
+
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition of this web process: pipeline stage and endpoint
+    latencies, HF API outcomes, heuristic fallbacks, frames per job and queue wait.
+    Jobs run in worker processes are included once they finish.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 if __name__ == "__main__":
@@ -1,5 +1,12 @@
 import subprocess
 import os
+import tempfile
+import wave
+import numpy as np
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 def extract_audio_from_video(video_path, audio_path):
     try:
@@ -20,12 +27,79 @@ def extract_audio_from_video(video_path, audio_path):
         result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
         if result.returncode != 0:
-            print("FFMPEG ERROR:", result.stderr.decode())
+            logger.error("ffmpeg failed: %s", result.stderr.decode(errors="replace"))
             return None
 
-        print("Audio extracted successfully:", safe_audio)
+        logger.debug("Audio extracted to %s", safe_audio)
         return safe_audio
 
     except Exception as e:
-        print("Audio extractor failed:", e)
+        logger.error("Audio extraction failed: %s", e)
         return None
+
+
+# ------------------------------
+# STREAMING PCM SOURCE
+# ------------------------------
+def iter_audio_chunks(video_path, sr: int = 16000, chunk_seconds: float = 10.0, wav_path: str = None):
+    """
+    Decode the audio track with ffmpeg straight into NumPy, one chunk at a time.
+
+    ffmpeg writes raw mono s16le at `sr` Hz to stdout; nothing touches disk and
+    only one chunk is held in memory. With wav_path, the same samples are also
+    written to a 16-bit WAV file as they stream past.
+
+    Yields:
+        float32 ndarrays in [-1, 1], each at most chunk_seconds long.
+    """
+    safe_video = video_path.replace("\\", "/")
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-i", safe_video,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sr),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "pipe:1"
+    ]
+    chunk_bytes = int(sr * chunk_seconds) * 2
+
+    # stderr goes to a temp file: a full stderr pipe would stall ffmpeg while we read stdout
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+        wav = None
+        try:
+            if wav_path:
+                wav = wave.open(wav_path.replace("\\", "/"), "wb")
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(sr)
+
+            pending = b""
+            while True:
+                data = proc.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - len(data) % 2
+                pending = data[usable:]
+                if not usable:
+                    continue
+                if wav:
+                    wav.writeframes(data[:usable])
+                yield np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+        finally:
+            if wav:
+                wav.close()
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+        if proc.returncode not in (0, -9):
+            err.seek(0)
+            tail = err.read()[-2000:].decode(errors="replace")
+            raise RuntimeError(f"ffmpeg exited with {proc.returncode}: {tail}")
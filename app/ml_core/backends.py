@@ -0,0 +1,191 @@
+import inspect
+import os
+import numpy as np
+from ..utils.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ------------------------------
+# CPU INFERENCE BACKENDS
+# ------------------------------
+# All backends share the Hugging Face image processor for preprocessing and
+# expose predict(pil_images) -> list of fake probabilities (0–1).
+#
+#   "torch"      – eager PyTorch fp32 (original path)
+#   "torch_int8" – torch dynamic int8 quantization of the Linear layers
+#   "onnx"       – ONNX export run with ONNX Runtime, graph optimizations on
+#   "onnx_int8"  – the ONNX export with int8 dynamically quantized weights
+#
+# ONNX exports are written once to ONNX_CACHE_DIR and reused on later starts.
+BACKENDS = ("torch", "torch_int8", "onnx", "onnx_int8")
+
+
+def fake_index(model) -> int:
+    labels = model.config.id2label
+    # Try to find “fake” label automatically
+    return next(
+        (int(i) for i, lbl in labels.items() if "fake" in lbl.lower()), 1
+    )
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class TorchBackend:
+    def __init__(self, processor, model, name: str = "torch", threads: int = 0):
+        import torch
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.name = name
+        self.processor = processor
+        self.model = model
+        self.fake_index = fake_index(model)
+        self.info = {"backend": name, "threads": torch.get_num_threads()}
+
+    def predict(self, pil_images) -> list:
+        import torch
+
+        inputs = self.processor(images=pil_images, return_tensors="pt")
+
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+
+        probs = torch.softmax(outputs.logits, dim=1)[:, self.fake_index]
+        return [float(p) for p in probs]
+
+
+class OnnxBackend:
+    def __init__(self, processor, model_path: str, fake_idx: int, name: str = "onnx", threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+
+        self.name = name
+        self.processor = processor
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.fake_index = fake_idx
+        self.info = {"backend": name, "threads": threads or "auto", "model_path": model_path}
+
+    def predict(self, pil_images) -> list:
+        inputs = self.processor(images=pil_images, return_tensors="np")
+        pixel_values = np.asarray(inputs["pixel_values"], dtype=np.float32)
+        logits = self.session.run(None, {self.input_name: pixel_values})[0]
+        return [float(p) for p in _softmax(logits)[:, self.fake_index]]
+
+
+# ------------------------------
+# EXPORT / QUANTIZATION
+# ------------------------------
+def torch_int8(model):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations quantized per batch)."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_onnx(model, model_id: str, quantize: bool = False, cache_dir: str = None) -> str:
+    """
+    Export the classifier to ONNX (dynamic batch axis), optionally int8-quantized.
+    Returns the path; an existing export in cache_dir is reused.
+    """
+    import torch
+
+    cache_dir = cache_dir or settings.ONNX_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    base = os.path.join(cache_dir, model_id.replace("/", "__"))
+    fp32_path = f"{base}.onnx"
+    int8_path = f"{base}.int8.onnx"
+
+    if not os.path.exists(fp32_path):
+        size = model.config.image_size if hasattr(model.config, "image_size") else 224
+        dummy = torch.zeros(1, 3, size, size)
+
+        class _Logits(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, pixel_values):
+                return self.inner(pixel_values=pixel_values).logits
+
+        # TorchScript exporter; newer torch defaults to the dynamo one, which needs onnxscript
+        kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+        # Export to a temp name so a crash never leaves a truncated model behind
+        tmp_path = f"{fp32_path}.part-{os.getpid()}"
+        torch.onnx.export(
+            _Logits(model).eval(),
+            (dummy,),
+            tmp_path,
+            input_names=["pixel_values"],
+            output_names=["logits"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=14,
+            **kwargs,
+        )
+        os.replace(tmp_path, fp32_path)
+        logger.info("Exported %s to %s", model_id, fp32_path)
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        tmp_path = f"{int8_path}.part-{os.getpid()}"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+        logger.info("Quantized %s to %s", model_id, int8_path)
+
+    return int8_path
+
+
+def build_backend(name: str, processor, model, model_id: str, threads: int = 0):
+    """Wrap a loaded PyTorch model in the requested backend."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend: {name}")
+    if name == "torch":
+        return TorchBackend(processor, model, threads=threads)
+    if name == "torch_int8":
+        return TorchBackend(processor, torch_int8(model), name=name, threads=threads)
+    path = export_onnx(model, model_id, quantize=name == "onnx_int8")
+    return OnnxBackend(processor, path, fake_index(model), name=name, threads=threads)
+
+
+# ------------------------------
+# PARITY CHECK
+# ------------------------------
+def parity_images(count: int = 8, size: int = 224, seed: int = 0) -> list:
+    """Deterministic synthetic RGB images (noise, gradients, flat colours) for parity checks."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    images = []
+    for i in range(count):
+        if i % 3 == 0:
+            arr = rng.integers(0, 256, (size, size, 3))
+        elif i % 3 == 1:
+            arr = np.stack([np.add.outer(ramp, ramp) / 2, np.tile(ramp, (size, 1)), np.full((size, size), 40.0 * i)], axis=2)
+        else:
+            arr = np.broadcast_to(rng.integers(0, 256, 3), (size, size, 3))
+        images.append(Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)))
+    return images
+
+
+def parity_diff(reference, candidate, images) -> float:
+    """Largest absolute difference in fake probability between two backends."""
+    ref = np.asarray(reference.predict(images))
+    out = np.asarray(candidate.predict(images))
+    return float(np.max(np.abs(ref - out)))
@@ -1,86 +1,152 @@
 import cv2
 import numpy as np
-import requests
+import threading
+from .remote import remote_client
+from ..services.metrics import HF_API_REQUESTS, HEURISTIC_FALLBACKS
 from ..utils.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ------------------------------
+# FRAME INPUT HELPERS
+# ------------------------------
+def load_frame(frame):
+    """
+    Accepts either a path to an image or an already decoded BGR ndarray.
+    Returns the ndarray, or None if it cannot be read.
+    """
+    if isinstance(frame, np.ndarray):
+        return frame
+    return cv2.imread(frame)
+
+
+def frame_to_jpeg_bytes(frame):
+    """Encode a frame (path or ndarray) to JPEG bytes for upload."""
+    if not isinstance(frame, np.ndarray):
+        with open(frame, "rb") as f:
+            return f.read()
+    ok, buf = cv2.imencode(".jpg", frame)
+    if not ok:
+        raise ValueError("Could not encode frame as JPEG")
+    return buf.tobytes()
+
 
 # ------------------------------
-# FACE PRESENCE DETECTION
+# FACE DETECTION
 # ------------------------------
-face_cascade = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
+FACE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+_local = threading.local()
+
+
+def _cascade():
+    # One classifier per thread, detectMultiScale keeps internal buffers
+    if not hasattr(_local, "cascade"):
+        _local.cascade = cv2.CascadeClassifier(FACE_CASCADE_PATH)
+    return _local.cascade
+
 
-def detect_face_presence(frame_path: str) -> bool:
-    """Check if any face is present in the given frame."""
+def detect_faces(frame, max_side: int = None) -> list:
+    """
+    Run Haar face detection once on a downscaled grayscale copy of the frame.
+    Returns boxes as [x, y, w, h] in original frame coordinates.
+    """
     try:
-        img = cv2.imread(frame_path)
+        img = load_frame(frame)
         if img is None:
-            return False
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.2, 4)
-        return len(faces) > 0
+            return []
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+        max_side = max_side or settings.FACE_DETECT_MAX_SIDE
+        scale = min(1.0, max_side / max(gray.shape[:2]))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        faces = _cascade().detectMultiScale(gray, 1.2, 4)
+        return [[int(round(v / scale)) for v in box] for box in faces]
     except Exception as e:
-        print("[FACE DETECTION ERROR]:", e)
-        return False
+        logger.warning("Face detection failed: %s", e)
+        return []
+
+
+def detect_face_presence(frame) -> bool:
+    """Check if any face is present in the given frame (path or ndarray)."""
+    return len(detect_faces(frame)) > 0
+
+
+def crop_faces(frame, boxes, size: int, margin: float = 0.2) -> list:
+    """Square crops around each box (plus margin), resized to size x size."""
+    h, w = frame.shape[:2]
+    crops = []
+    for x, y, bw, bh in boxes:
+        side = int(max(bw, bh) * (1 + margin))
+        cx, cy = x + bw // 2, y + bh // 2
+        x0, y0 = max(0, cx - side // 2), max(0, cy - side // 2)
+        x1, y1 = min(w, x0 + side), min(h, y0 + side)
+        crop = frame[y0:y1, x0:x1]
+        if crop.size:
+            crops.append(cv2.resize(crop, (size, size), interpolation=cv2.INTER_AREA))
+    return crops
+
+
+def locate_faces(frame, crop_size: int, full_frame_fallback: bool = False):
+    """
+    Face stage of the crop-first pipeline: one detection pass, then crops.
+
+    Returns:
+        (boxes, crops). With full_frame_fallback and no faces found, crops
+        holds the whole frame resized to crop_size so it can still be scored.
+    """
+    img = load_frame(frame)
+    if img is None:
+        return [], []
+    boxes = detect_faces(img)
+    if boxes:
+        return boxes, crop_faces(img, boxes, crop_size)
+    if full_frame_fallback:
+        return [], [cv2.resize(img, (crop_size, crop_size), interpolation=cv2.INTER_AREA)]
+    return [], []
 
 
 # ------------------------------
 # HUGGINGFACE API PREDICT
 # ------------------------------
-def hf_predict_frame(frame_path: str):
+def hf_predict_frame(frame):
     """
-    Sends a frame image to HuggingFace API.
+    Sends a frame image (path or ndarray) to HuggingFace API.
     Returns:
         (fake_score [0..1], "hf_api") if success,
         (None, None) if failed.
     """
-    model_id = settings.HF_DEEPFAKE_MODEL or "umarbutler/deepfake-detection"
-    headers = {}
-    if settings.HF_TOKEN:
-        headers["Authorization"] = f"Bearer {settings.HF_TOKEN}"
+    if remote_client.breaker.is_open:
+        HF_API_REQUESTS.inc(result="breaker_open")
+        return None, None
 
     try:
-        with open(frame_path, "rb") as f:
-            img_bytes = f.read()
-
-        response = requests.post(
-            f"https://api-inference.huggingface.co/models/{model_id}",
-            headers=headers,
-            data=img_bytes,
-            timeout=30
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            if isinstance(data, list) and len(data) > 0:
-                # Try to find label with "fake"
-                fake_prob = None
-                for item in data:
-                    if "fake" in str(item.get("label", "")).lower():
-                        fake_prob = float(item.get("score", 0.0))
-                        break
-                if fake_prob is None:
-                    fake_prob = float(max(x.get("score", 0.0) for x in data))
-                return fake_prob, "hf_api"
-
-        print("[HF API] Unexpected response:", response.status_code, response.text)
+        img_bytes = frame_to_jpeg_bytes(frame)
+        fake_prob = remote_client.score_bytes(img_bytes)
+        if fake_prob is not None:
+            HF_API_REQUESTS.inc(result="success")
+            return fake_prob, "hf_api"
+        HF_API_REQUESTS.inc(result="failure")
         return None, None
 
     except Exception as e:
-        print("[HF API ERROR]:", e)
+        logger.warning("HF API scoring failed: %s", e)
+        HF_API_REQUESTS.inc(result="error")
         return None, None
 
 
 # ------------------------------
 # SIMPLE HEURISTIC FALLBACK
 # ------------------------------
-def heuristic_predict(frame_path: str):
+def heuristic_predict(frame):
     """
     Simple fallback when HuggingFace API fails.
     Uses image sharpness as heuristic score.
     """
     try:
-        img = cv2.imread(frame_path)
+        img = load_frame(frame)
         if img is None:
             return 0.5, "heuristic"
 
@@ -88,19 +154,28 @@ def heuristic_predict(frame_path: str):
         score = max(0.0, min(1.0, 1 - np.tanh(lap / 1000)))
         return float(score), "heuristic"
     except Exception as e:
-        print("[HEURISTIC ERROR]:", e)
+        logger.warning("Heuristic scoring failed: %s", e)
         return 0.5, "heuristic"
 
 
 # ------------------------------
 # MAIN PREDICTION FUNCTION
 # ------------------------------
-def predict_frame(frame_path: str):
-    """Main unified prediction entry."""
-    hf_score, method = hf_predict_frame(frame_path)
+def predict_frame(frame):
+    """Main unified prediction entry. Accepts a frame path or a decoded ndarray."""
+    hf_score, method = hf_predict_frame(frame)
     if hf_score is not None:
         return hf_score, method
-    return heuristic_predict(frame_path)
+    HEURISTIC_FALLBACKS.inc()
+    return heuristic_predict(frame)
+
+
+def submit_predict_frame(frame):
+    """
+    Schedule predict_frame on the pooled HF API workers.
+    Returns a Future resolving to (score, method).
+    """
+    return remote_client.submit(predict_frame, frame)
 
 
 
@@ -1,47 +1,327 @@
 import cv2
 import os
+import itertools
+import queue
+import threading
+import numpy as np
+from ..utils.logger import get_logger
 
-def extract_frames(video_path: str, output_folder: str, fps: int = 1):
+logger = get_logger(__name__)
+
+SAMPLING_STRATEGIES = ("interval", "uniform", "scene", "adaptive")
+
+# Seeking lands on the previous keyframe and decodes forward, so it only pays
+# off when the gap to the next sample is longer than a typical GOP
+SEEK_MIN_GAP_SEC = 2.0
+
+
+def _target_frames(strategy: str, total: int, frame_interval: int, max_frames: int):
+    """Frame numbers to decode for the interval/uniform strategies (None = open-ended)."""
+    if strategy == "uniform" and total > 0 and max_frames:
+        n = min(max_frames, total)
+        return sorted({int(k * total / n) for k in range(n)})
+    if total > 0:
+        targets = list(range(0, total, frame_interval))
+        return targets[:max_frames] if max_frames else targets
+    return None
+
+
+def coarse_to_fine_levels(count: int, first_pass: int = 8) -> list:
     """
-    Extract frames from a video file at the specified FPS.
-    Returns a list of saved frame paths.
+    Split grid positions 0..count-1 into refinement levels.
+
+    Level 0 is about `first_pass` positions spread over the whole grid; every
+    further level adds the midpoints between the positions already taken, so
+    the density doubles per level and any prefix of levels covers the whole
+    video evenly. Positions within a level are ascending, so one level is one
+    forward pass over the file.
     """
-    try:
-        os.makedirs(output_folder, exist_ok=True)
+    if count <= 0:
+        return []
+    stride = 1
+    while count / (stride * 2) >= max(1, first_pass):
+        stride *= 2
+
+    levels = [list(range(0, count, stride))]
+    while stride > 1:
+        half = stride // 2
+        levels.append(list(range(half, count, stride)))
+        stride = half
+    return levels
+
+
+def _read_at(vidcap, position: int, target: int, seek_min_gap: int):
+    """
+    Decode frame number `target`, grabbing forward from `position` or seeking
+    when the gap is large (or backwards). Returns (new position, frame or None);
+    the frame is also None at end of stream.
+    """
+    if target < position or (seek_min_gap and target - position > seek_min_gap):
+        vidcap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        position = target
+
+    while position < target:
+        if not vidcap.grab():
+            return position, None
+        position += 1
+
+    if not vidcap.grab():
+        return position, None
+    position += 1
+    success, frame = vidcap.retrieve()
+    return position, frame if success else None
+
+
+def _scene_signature(frame):
+    small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
 
-        vidcap = cv2.VideoCapture(video_path)
-        if not vidcap.isOpened():
-            print(f"[FRAME EXTRACTION ERROR] Could not open video: {video_path}")
-            return []
 
+def iter_frames(
+    video_path: str,
+    fps: float = 1,
+    max_frames: int = None,
+    strategy: str = "interval",
+    seek: bool = False,
+    scene_threshold: float = 12.0,
+):
+    """
+    Stream decoded frames from a video at the specified FPS.
+
+    Frames are yielded straight from cv2.VideoCapture, nothing is written to disk.
+    Skipped frames are only grab()bed (demuxed, never converted to BGR), or
+    jumped over entirely with seek=True.
+
+    Args:
+        fps: sampling rate for "interval" and candidate rate for "scene"
+        max_frames: stop after this many frames (required by "uniform")
+        strategy:
+            "interval" – one frame every 1/fps seconds
+            "uniform"  – max_frames frames spread evenly over the whole video
+            "scene"    – candidates at fps, yielded only when the picture changes
+                         by more than scene_threshold (mean abs diff, 0–255)
+        seek: jump to each target with CAP_PROP_POS_FRAMES instead of grabbing
+              through gaps longer than SEEK_MIN_GAP_SEC
+
+    Yields:
+        (index, timestamp_sec, frame) where frame is a BGR ndarray.
+    """
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {strategy}")
+    if strategy == "adaptive":
+        raise ValueError("adaptive sampling is decoded with iter_frames_coarse_to_fine")
+
+    vidcap = cv2.VideoCapture(video_path)
+    if not vidcap.isOpened():
+        logger.error("Could not open video: %s", video_path)
+        return
+
+    try:
         original_fps = vidcap.get(cv2.CAP_PROP_FPS)
         if not original_fps or original_fps <= 0:
             original_fps = fps  # fallback to user FPS
 
         frame_interval = max(1, int(round(original_fps / fps)))
+        total = int(vidcap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
 
-        frames = []
-        count = 0
-        saved = 0
+        # CAP_PROP_FRAME_COUNT is an estimate from the container (often short for
+        # VFR or badly muxed files), so only "uniform" and seek mode plan from
+        # it, and every strategy but "uniform" keeps decoding until read() fails
+        targets = _target_frames(strategy, total, frame_interval, max_frames)
+        if targets is None or (strategy != "uniform" and not seek):
+            targets = itertools.repeat(None)
+        elif strategy != "uniform":
+            targets = itertools.chain(targets, itertools.repeat(None))
 
-        while True:
-            success, frame = vidcap.read()
-            if not success:
+        seek_min_gap = int(SEEK_MIN_GAP_SEC * original_fps)
+        position = 0  # frame number the next grab() will return
+        index = 0
+        last_signature = None
+
+        for target in targets:
+            if max_frames and index >= max_frames:
                 break
 
-            if count % frame_interval == 0:
-                frame_path = os.path.join(output_folder, f"frame_{saved:05d}.jpg")
-                success_write = cv2.imwrite(frame_path, frame)
-                if success_write:
-                    frames.append(frame_path)
-                    saved += 1
-            count += 1
+            if target is None:
+                # Sequential scan: grab up to the next multiple of frame_interval
+                target = position + (-position % frame_interval)
+
+            position, frame = _read_at(vidcap, position, target, seek_min_gap if seek else 0)
+            if frame is None:
+                if position <= target:
+                    return  # end of stream
+                continue
+
+            if strategy == "scene":
+                signature = _scene_signature(frame)
+                if last_signature is not None and float(np.mean(np.abs(signature - last_signature))) < scene_threshold:
+                    continue
+                last_signature = signature
+
+            yield index, target / original_fps, frame
+            index += 1
+
+    finally:
+        vidcap.release()
+
+
+def iter_frames_coarse_to_fine(video_path: str, fps: float = 1, max_frames: int = None, first_pass: int = 8):
+    """
+    Decode the fps sampling grid in coarse-to-fine order (see coarse_to_fine_levels).
+
+    Indices are grid positions, the same as the "interval" strategy would give
+    the frame, so names and timestamps are comparable. Stops after max_frames.
+    Videos without a frame count fall back to interval order as a single level;
+    frames past an under-reported count are decoded in order as a final level.
+
+    Yields:
+        (level, index, timestamp_sec, frame)
+    """
+    vidcap = cv2.VideoCapture(video_path)
+    if not vidcap.isOpened():
+        logger.error("Could not open video: %s", video_path)
+        return
 
+    try:
+        original_fps = vidcap.get(cv2.CAP_PROP_FPS)
+        if not original_fps or original_fps <= 0:
+            original_fps = fps
+        frame_interval = max(1, int(round(original_fps / fps)))
+        total = int(vidcap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        grid_size = -(-total // frame_interval)
+        levels = coarse_to_fine_levels(grid_size, first_pass)
+    finally:
         vidcap.release()
 
-        print(f"[FRAME EXTRACTION] {saved} frames extracted from {video_path}")
+    if not levels:
+        for index, timestamp, frame in iter_frames(video_path, fps, max_frames):
+            yield 0, index, timestamp, frame
+        return
+
+    vidcap = cv2.VideoCapture(video_path)
+    try:
+        seek_min_gap = int(SEEK_MIN_GAP_SEC * original_fps)
+        position = 0
+        produced = 0
+        for level, positions in enumerate(levels):
+            for index in positions:
+                if max_frames and produced >= max_frames:
+                    return
+                target = index * frame_interval
+                position, frame = _read_at(vidcap, position, target, seek_min_gap)
+                if frame is None:
+                    continue  # past a truncated end, or a damaged frame
+                yield level, index, target / original_fps, frame
+                produced += 1
+
+        # The frame count is an estimate: grid positions past it form one last level
+        index = grid_size
+        while not (max_frames and produced >= max_frames):
+            target = index * frame_interval
+            position, frame = _read_at(vidcap, position, target, seek_min_gap)
+            if frame is None:
+                if position <= target:
+                    return  # end of stream
+                index += 1
+                continue
+            yield len(levels), index, target / original_fps, frame
+            index += 1
+            produced += 1
+    finally:
+        vidcap.release()
+
+
+_END = object()
+
+
+def prefetch_frames(frame_iter, maxsize: int = 32):
+    """
+    Run a frame generator in a background decode thread.
+
+    Frames pass through a bounded queue, so decoding runs ahead of the consumer
+    by at most `maxsize` frames. Errors from the decoder are re-raised in the
+    consumer; closing the returned generator stops the decoder.
+    """
+    frames = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    error = []
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode():
+        try:
+            for item in frame_iter:
+                if not _put(item):
+                    break
+        except Exception as e:
+            error.append(e)
+        finally:
+            close = getattr(frame_iter, "close", None)
+            if close:
+                close()
+            _put(_END)
+
+    decoder = threading.Thread(target=_decode, name="frame-decoder", daemon=True)
+    decoder.start()
+
+    try:
+        while True:
+            item = frames.get()
+            if item is _END:
+                break
+            yield item
+        if error:
+            raise error[0]
+    finally:
+        stop.set()
+        decoder.join(timeout=5)
+
+
+def frame_name(index: int) -> str:
+    """File name used for a sampled frame, whether or not it is written to disk."""
+    return f"frame_{index:05d}.jpg"
+
+
+def frame_index(name: str) -> int:
+    """Inverse of frame_name()."""
+    return int(name[len("frame_"):-len(".jpg")])
+
+
+def save_frame(frame, output_folder: str, index: int):
+    """
+    Write a single decoded frame as JPEG.
+    Returns the saved path, or None if the write failed.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    frame_path = os.path.join(output_folder, frame_name(index))
+    if cv2.imwrite(frame_path, frame):
+        return frame_path
+    return None
+
+
+def extract_frames(video_path: str, output_folder: str, fps: int = 1):
+    """
+    Extract frames from a video file at the specified FPS.
+    Returns a list of saved frame paths.
+    """
+    try:
+        frames = []
+
+        for index, _, frame in iter_frames(video_path, fps):
+            frame_path = save_frame(frame, output_folder, index)
+            if frame_path:
+                frames.append(frame_path)
+
+        logger.info("%d frames extracted from %s", len(frames), video_path)
         return frames
 
     except Exception as e:
-        print("[FRAME EXTRACTION FAILED]:", str(e))
+        logger.error("Frame extraction failed: %s", e)
         return []
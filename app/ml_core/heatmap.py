@@ -1,7 +1,34 @@
+import cv2
 import numpy as np
-import matplotlib.pyplot as plt
+from ..utils.logger import get_logger
 
-def create_heatmap_from_scores(frames, scores, output_path):
+logger = get_logger(__name__)
+
+# ------------------------------
+# PRECOMPUTED INFERNO LUT
+# ------------------------------
+# 256 BGR colours, index = round(score * 255). Built once; rendering is then a
+# plain NumPy gather, with no matplotlib figure state shared between workers.
+INFERNO_LUT = cv2.applyColorMap(
+    np.arange(256, dtype=np.uint8).reshape(256, 1), cv2.COLORMAP_INFERNO
+).reshape(256, 3)
+
+WHITE = (255, 255, 255)
+TEXT = (30, 30, 30)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def scores_to_colors(scores) -> np.ndarray:
+    """Map scores in 0–1 to BGR colours, shape (n, 3)."""
+    idx = np.clip(np.rint(np.asarray(scores, dtype=np.float32) * 255), 0, 255).astype(np.uint8)
+    return INFERNO_LUT[idx]
+
+
+def _put_text(img, text, org, scale=0.5, thickness=1, color=TEXT):
+    cv2.putText(img, text, org, FONT, scale, color, thickness, cv2.LINE_AA)
+
+
+def create_heatmap_from_scores(frames, scores, output_path, width: int = 1200, height: int = 240):
     """
     Generates a horizontal heatmap representing fake probabilities of video frames.
 
@@ -12,24 +39,84 @@ def create_heatmap_from_scores(frames, scores, output_path):
     """
     try:
         if not scores or len(scores) == 0:
-            print("[HEATMAP] No scores found — skipping heatmap generation.")
+            logger.info("No scores found — skipping heatmap generation.")
             return None
 
-        arr = np.array(scores)
+        colors = scores_to_colors(scores)
+        n = len(colors)
+
+        # Layout: title on top, strip on the left, colour bar on the right
+        top, bottom, left, right = 36, 40, 20, 110
+        strip_w = width - left - right
+        strip_h = height - top - bottom
+
+        canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+
+        # Each frame owns an equal column block (nearest-neighbour, like imshow)
+        cols = np.minimum((np.arange(strip_w) * n) // strip_w, n - 1)
+        canvas[top:top + strip_h, left:left + strip_w] = colors[cols][np.newaxis, :, :]
+
+        # Colour bar 0 (bottom) → 1 (top)
+        bar_x = left + strip_w + 20
+        bar = INFERNO_LUT[np.linspace(255, 0, strip_h).astype(np.uint8)]
+        canvas[top:top + strip_h, bar_x:bar_x + 16] = bar[:, np.newaxis, :]
+        _put_text(canvas, "1.0", (bar_x + 22, top + 10), 0.4)
+        _put_text(canvas, "0.5", (bar_x + 22, top + strip_h // 2 + 4), 0.4)
+        _put_text(canvas, "0.0", (bar_x + 22, top + strip_h), 0.4)
+
+        # Frame ticks (about 10 labels)
+        step = max(1, n // 10)
+        for i in range(0, n, step):
+            x = left + int((i + 0.5) * strip_w / n)
+            cv2.line(canvas, (x, top + strip_h), (x, top + strip_h + 4), TEXT, 1)
+            _put_text(canvas, str(i), (x - 6, top + strip_h + 18), 0.4)
+
+        _put_text(canvas, "Deepfake Detection Heatmap - Frame-wise Fake Probability", (left, 24), 0.55)
+        _put_text(canvas, "Frames", (left + strip_w // 2 - 25, height - 6), 0.45)
+
+        if not cv2.imwrite(output_path, canvas):
+            raise IOError(f"cv2.imwrite failed for {output_path}")
+
+        logger.debug("Heatmap saved at %s", output_path)
+        return output_path
+
+    except Exception as e:
+        logger.error("Heatmap failed: %s", e)
+        return None
+
+
+def render_face_heat(frame, faces, output_path, max_side: int = 480, alpha: float = 0.45):
+    """
+    Thumbnail of a frame with each face box tinted by its fake probability.
+
+    Args:
+        frame: BGR ndarray or path to an image
+        faces (list): [{"box": [x, y, w, h], "fake_prob": float}, ...] in frame coordinates
+        output_path (str): where to write the JPEG
+    """
+    try:
+        if not isinstance(frame, np.ndarray):
+            frame = cv2.imread(frame)
+            if frame is None:
+                return None
+        scale = min(1.0, max_side / max(frame.shape[:2]))
+        thumb = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else frame.copy()
+        overlay = thumb.copy()
 
-        plt.figure(figsize=(12, 2))
-        plt.imshow(arr[np.newaxis, :], cmap='inferno', aspect="auto")
-        plt.colorbar(label="Fake Probability (0–1)")
-        plt.title("Deepfake Detection Heatmap — Frame-wise Fake Probability")
-        plt.xlabel("Frames")
-        plt.yticks([])
-        plt.tight_layout()
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        for face in faces:
+            if face.get("fake_prob") is None:
+                continue
+            x, y, w, h = [int(round(v * scale)) for v in face["box"]]
+            color = tuple(int(c) for c in scores_to_colors([face["fake_prob"]])[0])
+            cv2.rectangle(overlay, (x, y), (x + w, y + h), color, -1)
+            cv2.rectangle(thumb, (x, y), (x + w, y + h), color, 2)
+            _put_text(thumb, f"{face['fake_prob']:.2f}", (x, max(12, y - 4)), 0.45, 1, WHITE)
 
-        print(f"[HEATMAP] Saved successfully at: {output_path}")
+        blended = cv2.addWeighted(overlay, alpha, thumb, 1 - alpha, 0)
+        if not cv2.imwrite(output_path, blended):
+            raise IOError(f"cv2.imwrite failed for {output_path}")
         return output_path
 
     except Exception as e:
-        print("[HEATMAP ERROR]:", e)
+        logger.error("Face heat overlay failed: %s", e)
         return None
@@ -1,60 +1,240 @@
 # app/ml_core/hf_model.py
-from transformers import AutoModelForImageClassification, AutoImageProcessor
-import torch
 from PIL import Image
+import numpy as np
+import threading
+import queue
+import time
+from concurrent.futures import Future
+from .backends import TorchBackend, build_backend, parity_diff, parity_images
+from .registry import model_registry, MODEL_LOADING
+from ..utils.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # ------------------------------
 # HUGGING FACE MODEL SETTINGS
 # ------------------------------
 HF_MODEL = "umarbutler/deepfake-detection"  # ✅ public + working model
 
+
 # ------------------------------
-# LOAD MODEL SAFELY
+# LAZY MODEL LOADING
 # ------------------------------
-try:
-    print(f"[HF MODEL] Loading model: {HF_MODEL} ...")
+# transformers/torch are imported inside the loader, so importing this module
+# (and every route that uses it) stays cheap; the weights are read on first
+# use or when the app starts the registry at boot.
+def _load_hf_model():
+    from transformers import AutoModelForImageClassification, AutoImageProcessor
+
     processor = AutoImageProcessor.from_pretrained(HF_MODEL)
     model = AutoModelForImageClassification.from_pretrained(HF_MODEL)
     model.eval()
-    print(f"[HF MODEL] Loaded successfully: {HF_MODEL}")
-except Exception as e:
-    print(f"[HF MODEL ERROR] Could not load {HF_MODEL}")
-    print("Error:", str(e))
-    processor = None
-    model = None
+
+    threads = settings.MODEL_INTRA_OP_THREADS
+    backend_name = settings.MODEL_BACKEND
+    if backend_name == "torch":
+        return TorchBackend(processor, model, threads=threads)
+
+    # Optimized backends must agree with eager PyTorch, otherwise serve the original path
+    try:
+        backend = build_backend(backend_name, processor, model, HF_MODEL, threads=threads)
+        reference = TorchBackend(processor, model, threads=threads)
+        if settings.MODEL_PARITY_TOL > 0:
+            diff = parity_diff(reference, backend, parity_images())
+            backend.info["parity_max_diff"] = round(diff, 5)
+            if diff > settings.MODEL_PARITY_TOL:
+                raise ValueError(f"parity check failed, max diff {diff:.4f} > {settings.MODEL_PARITY_TOL}")
+        return backend
+    except Exception as e:
+        logger.warning("%s backend unavailable, using torch: %s", backend_name, e)
+        fallback = TorchBackend(processor, model, threads=threads)
+        fallback.info["fallback_from"] = backend_name
+        return fallback
+
+
+def _warmup_hf_model(backend):
+    # One dummy forward pass allocates the inference buffers up front
+    backend.predict([Image.new("RGB", (224, 224))])
+
+
+model_registry.register(HF_MODEL, _load_hf_model, warmup=_warmup_hf_model)
+
+
+def get_model():
+    """The inference backend, loading it on first call. None if loading failed."""
+    return model_registry.get(HF_MODEL)
+
+
+def model_loaded() -> bool:
+    """True if the local model is usable; loads it on first call."""
+    return get_model() is not None
+
+
+def model_loading() -> bool:
+    """Non-blocking: True while the model is being loaded (preload or first use)."""
+    return model_registry.state(HF_MODEL) == MODEL_LOADING
+
+
+def local_model_id() -> str:
+    """Model identity for result caching; optimized backends score slightly differently."""
+    if settings.MODEL_BACKEND == "torch":
+        return HF_MODEL
+    return f"{HF_MODEL}:{settings.MODEL_BACKEND}"
+
+
+# ------------------------------
+# INPUT CONVERSION
+# ------------------------------
+def _to_pil(image) -> Image.Image:
+    """Accepts a file path, a BGR ndarray (OpenCV) or a PIL image."""
+    if isinstance(image, Image.Image):
+        return image.convert("RGB")
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return Image.fromarray(image).convert("RGB")
+        return Image.fromarray(np.ascontiguousarray(image[..., 2::-1]))
+    return Image.open(image).convert("RGB")
+
+
+# ------------------------------
+# BATCH PREDICTION FUNCTION
+# ------------------------------
+class PredictionFailed(RuntimeError):
+    """The model is unavailable or could not score this image (batcher futures only)."""
+
+
+def _predict_batch(images, batch_size: int) -> list:
+    """Scores in input order, None for images that could not be scored."""
+    backend = get_model()
+    if backend is None:
+        logger.error("Model not loaded properly")
+        return [None] * len(images)
+
+    batch_size = max(1, batch_size or settings.HF_BATCH_SIZE)
+    results = []
+
+    for start in range(0, len(images), batch_size):
+        # Convert one by one: an unreadable image must not fail the rest of its batch
+        chunk = {}
+        for pos, img in enumerate(images[start:start + batch_size]):
+            try:
+                chunk[pos] = _to_pil(img)
+            except Exception as e:
+                logger.error("Could not read image for prediction: %s", e)
+        scores = [None] * min(batch_size, len(images) - start)
+        try:
+            if chunk:
+                for pos, score in zip(chunk, backend.predict(list(chunk.values()))):
+                    scores[pos] = score
+
+        except Exception as e:
+            logger.error("Batch prediction failed: %s", e)
+        results.extend(scores)
+
+    return results
+
+
+def hf_predict_images(images, batch_size: int = None) -> list:
+    """
+    Predict fake probabilities (0–1) for a list of images.
+
+    Args:
+        images (list): file paths, BGR ndarrays or PIL images
+        batch_size (int, optional): images per forward pass (default = settings.HF_BATCH_SIZE)
+
+    Returns:
+        list of floats in the same order as the input.
+        Images that fail get 0.0, like hf_predict_image.
+    """
+    return [0.0 if score is None else score for score in _predict_batch(images, batch_size)]
 
 
 # ------------------------------
 # IMAGE PREDICTION FUNCTION
 # ------------------------------
-def hf_predict_image(image_path: str) -> float:
+def hf_predict_image(image_path) -> float:
     """
     Predict fake probability (0–1) for a single image.
     Returns 0.0 if model is not loaded or fails.
     """
-    if processor is None or model is None:
-        print("[HF_MODEL] Model not loaded properly, returning 0.0")
-        return 0.0
+    fake_prob = hf_predict_images([image_path], batch_size=1)[0]
+    logger.debug("Fake probability: %.4f", fake_prob)
+    return fake_prob
 
-    try:
-        img = Image.open(image_path).convert("RGB")
-        inputs = processor(images=img, return_tensors="pt")
 
-        with torch.no_grad():
-            outputs = model(**inputs)
+# ------------------------------
+# DYNAMIC MICRO-BATCHING
+# ------------------------------
+class BatchInferenceService:
+    """
+    Merges concurrent prediction requests into micro-batches.
 
-        probs = torch.softmax(outputs.logits, dim=1)[0]
-        labels = model.config.id2label
+    Callers submit single images and get a Future back. A worker thread
+    collects requests until `max_batch` is reached or the oldest request
+    has waited `max_wait_ms`, then runs them through the model in one
+    forward pass. An image that cannot be scored fails its Future with
+    PredictionFailed instead of resolving to 0.0, so callers can tell.
+    """
 
-        # Try to find “fake” label automatically
-        fake_index = next(
-            (i for i, lbl in labels.items() if "fake" in lbl.lower()), 1
-        )
+    def __init__(self, max_batch: int, max_wait_ms: int):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        # Bounded so producers (video decode loops) get backpressure
+        self._queue = queue.Queue(maxsize=self.max_batch * 4)
+        self._lock = threading.Lock()
+        self._worker = None
 
-        fake_prob = float(probs[fake_index])
-        print(f"[HF_MODEL] Fake probability: {fake_prob:.4f}")
-        return fake_prob
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="hf-batcher", daemon=True
+                )
+                self._worker.start()
 
-    except Exception as e:
-        print("[HF_MODEL] Prediction failed:", str(e))
-        return 0.0
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            images = [img for img, _ in batch]
+            try:
+                scores = _predict_batch(images, batch_size=self.max_batch)
+                for (_, fut), score in zip(batch, scores):
+                    if score is None:
+                        fut.set_exception(PredictionFailed("Model could not score the image"))
+                    else:
+                        fut.set_result(score)
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+
+    def submit(self, image) -> Future:
+        """Queue one image (path, ndarray or PIL) for scoring."""
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((image, fut))
+        return fut
+
+    def predict(self, image) -> float:
+        return self.submit(image).result()
+
+    def predict_many(self, images) -> list:
+        futures = [self.submit(img) for img in images]
+        return [f.result() for f in futures]
+
+
+batcher = BatchInferenceService(
+    max_batch=settings.HF_BATCH_SIZE,
+    max_wait_ms=settings.HF_BATCH_MAX_WAIT_MS,
+)
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..utils.config import settings
+
+
+class _InlineExecutor:
+    """Runs work immediately in the caller; used for FRAME_EXECUTOR=serial."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class FrameExecutor:
+    """
+    Bounded pool for per-frame CPU work (Haar face detection, heuristic scoring).
+
+    kind:
+        "serial"  – run inline, same as the original loop
+        "thread"  – thread pool; OpenCV releases the GIL in most kernels
+        "process" – process pool, frames are pickled to the workers
+
+    Results are Futures, so callers keep frame order by holding them in a list.
+    Submission blocks once `workers * 4` frames are in flight, which keeps
+    memory bounded while the decoder runs ahead.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = None):
+        self.kind = kind
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._pending = threading.BoundedSemaphore(self.workers * 4)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                elif self.kind == "thread":
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="frame"
+                    )
+                else:
+                    self._pool = _InlineExecutor()
+            return self._pool
+
+    def submit(self, fn, *args) -> Future:
+        self._pending.acquire()
+        try:
+            fut = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._pending.release()
+            raise
+        fut.add_done_callback(lambda _: self._pending.release())
+        return fut
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+frame_executor = FrameExecutor(
+    kind=settings.FRAME_EXECUTOR,
+    workers=settings.FRAME_WORKERS,
+)
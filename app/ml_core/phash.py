@@ -0,0 +1,96 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+# ------------------------------
+# PERCEPTUAL HASH (dHash)
+# ------------------------------
+def dhash(frame, hash_size: int = 8) -> int:
+    """
+    Difference hash of a BGR/gray frame as a 64-bit int (for hash_size=8).
+    Near-identical frames give hashes with a small Hamming distance.
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+# ------------------------------
+# NEAR-DUPLICATE LOOKUP TABLE
+# ------------------------------
+class FrameHashIndex:
+    """
+    Bounded LRU of frame hashes -> value, matched by Hamming distance.
+
+    Hashes are kept in a NumPy array so a lookup is one vectorized XOR +
+    popcount over all entries instead of a Python loop.
+    """
+
+    def __init__(self, threshold: int = 5, capacity: int = 256):
+        self.threshold = threshold
+        self.capacity = max(1, capacity)
+        self._hashes = np.zeros(self.capacity, dtype=np.uint64)
+        self._last_used = np.full(self.capacity, -1, dtype=np.int64)
+        self._values = [None] * self.capacity
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, frame_hash: int):
+        """Return the value of the closest stored hash within threshold, else None."""
+        with self._lock:
+            self._clock += 1
+            used = self._last_used >= 0
+            if used.any():
+                distances = _popcount64(self._hashes ^ np.uint64(frame_hash))
+                distances[~used] = 65
+                best = int(np.argmin(distances))
+                if distances[best] <= self.threshold:
+                    self._last_used[best] = self._clock
+                    self.hits += 1
+                    return self._values[best]
+            self.misses += 1
+            return None
+
+    def add(self, frame_hash: int, value) -> None:
+        with self._lock:
+            self._clock += 1
+            slot = int(np.argmin(self._last_used))  # empty (-1) or least recently used
+            self._hashes[slot] = np.uint64(frame_hash)
+            self._last_used[slot] = self._clock
+            self._values[slot] = value
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# ------------------------------
+# PROCESS-WIDE SCORE CACHE
+# ------------------------------
+_global_indexes = {}
+_global_lock = threading.Lock()
+
+
+def global_frame_index(model_id: str, threshold: int, capacity: int) -> FrameHashIndex:
+    """Cross-job index of resolved (score, method) values, one per scorer/model (opt-in, see FRAME_DEDUP_GLOBAL_SIZE)."""
+    with _global_lock:
+        index = _global_indexes.get(model_id)
+        if index is None:
+            index = FrameHashIndex(threshold=threshold, capacity=capacity)
+            _global_indexes[model_id] = index
+        return index
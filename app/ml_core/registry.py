@@ -0,0 +1,128 @@
+import threading
+import time
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Model states, in the order a model moves through them
+MODEL_NOT_LOADED = "not_loaded"
+MODEL_LOADING = "loading"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+
+class _Entry:
+    def __init__(self, loader, warmup):
+        self.loader = loader
+        self.warmup = warmup
+        self.value = None
+        self.state = MODEL_NOT_LOADED
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Loads models on first use instead of at import time.
+
+    Each model is registered with a loader (returns the loaded object) and an
+    optional warmup callable (runs one dummy inference on it). A model is
+    loaded at most once: concurrent callers of get() wait for the same load,
+    and a failed load is remembered so requests fall back instead of retrying
+    a multi-second download on every call.
+
+    start() kicks loading off in a background thread, so the web app can
+    answer /health while weights are still being read.
+    """
+
+    def __init__(self):
+        self._models = {}
+
+    def register(self, name: str, loader, warmup=None):
+        self._models[name] = _Entry(loader, warmup)
+
+    def _load(self, name: str):
+        entry = self._models[name]
+        with entry.lock:
+            if entry.state != MODEL_NOT_LOADED:
+                return
+            entry.state = MODEL_LOADING
+
+        try:
+            logger.info("Loading %s ...", name)
+            t0 = time.perf_counter()
+            value = entry.loader()
+            entry.load_seconds = round(time.perf_counter() - t0, 3)
+
+            if entry.warmup is not None:
+                t0 = time.perf_counter()
+                entry.warmup(value)
+                entry.warmup_seconds = round(time.perf_counter() - t0, 3)
+
+            entry.value = value
+            entry.state = MODEL_READY
+            logger.info(
+                "%s ready (load %ss, warmup %ss)", name, entry.load_seconds, entry.warmup_seconds
+            )
+        except Exception as e:
+            entry.error = str(e)
+            entry.state = MODEL_FAILED
+            logger.error("Could not load %s: %s", name, e)
+        finally:
+            entry.done.set()
+
+    def get(self, name: str, wait: bool = True):
+        """
+        Return the loaded model, loading it now if nobody has yet.
+        Returns None if loading failed, or if wait=False and it is not ready.
+        """
+        entry = self._models[name]
+        if entry.state == MODEL_NOT_LOADED:
+            if not wait:
+                return None
+            self._load(name)
+        if wait:
+            entry.done.wait()
+        return entry.value if entry.state == MODEL_READY else None
+
+    def start(self, names=None, background: bool = True):
+        """Load (and warm up) the given models, all registered ones by default."""
+        names = list(names or self._models)
+        if not background:
+            for name in names:
+                self._load(name)
+            return None
+        thread = threading.Thread(
+            target=lambda: [self._load(n) for n in names], name="model-loader", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def state(self, name: str) -> str:
+        return self._models[name].state
+
+    def ready(self) -> bool:
+        """True once every registered model is loaded and warmed; a model nobody has asked for yet is not ready."""
+        return all(e.state == MODEL_READY for e in self._models.values())
+
+    def not_loaded(self) -> list:
+        """Models no one has asked for yet (MODEL_PRELOAD=lazy)."""
+        return [name for name, e in self._models.items() if e.state == MODEL_NOT_LOADED]
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "state": e.state,
+                "load_seconds": e.load_seconds,
+                "warmup_seconds": e.warmup_seconds,
+                "error": e.error,
+                "info": getattr(e.value, "info", None),
+            }
+            for name, e in self._models.items()
+        }
+
+
+model_registry = ModelRegistry()
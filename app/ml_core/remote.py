@@ -0,0 +1,228 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utils.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# ------------------------------
+# CIRCUIT BREAKER
+# ------------------------------
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and stays open for
+    `reset_after` seconds. While open, callers should skip the remote call
+    entirely. After the cool-down the breaker goes half-open: allow() admits
+    exactly one trial call, everyone else is still refused until the trial
+    closes the breaker (success) or re-opens it (failure).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int = 5, reset_after: float = 60.0):
+        self.threshold = max(1, threshold)
+        self.reset_after = reset_after
+        self._failures = 0
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Non-mutating check: True while calls would be refused (open, or a trial is in flight)."""
+        with self._lock:
+            if self._state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.reset_after
+            return self._state == self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Take permission for one call; after the cool-down only the first caller gets it."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+                self._state = self.HALF_OPEN
+                logger.info("Circuit half-open, sending a trial request")
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit closed")
+            self._failures = 0
+            self._state = self.CLOSED
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                logger.warning("Circuit re-opened, trial request failed")
+            elif self._state == self.CLOSED and self._failures >= self.threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                logger.warning("Circuit opened after %d consecutive failures", self._failures)
+
+
+# ------------------------------
+# RESPONSE PARSING
+# ------------------------------
+def parse_fake_score(data):
+    """Extract the fake probability from an image-classification response."""
+    if not isinstance(data, list) or len(data) == 0:
+        return None
+    # Try to find label with "fake"
+    for item in data:
+        if "fake" in str(item.get("label", "")).lower():
+            return float(item.get("score", 0.0))
+    return float(max(x.get("score", 0.0) for x in data))
+
+
+# ------------------------------
+# POOLED REMOTE CLIENT
+# ------------------------------
+class HFRemoteClient:
+    """
+    Keep-alive client for the HuggingFace Inference API.
+
+    - One pooled requests.Session shared by all worker threads
+    - At most `concurrency` requests in flight
+    - Backs off on 503 "model loading" and 429 responses
+    - Circuit breaker so a dead endpoint fails fast instead of timing out per frame
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model_id: str,
+        token: str = None,
+        concurrency: int = 4,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 20.0,
+        breaker: CircuitBreaker = None,
+    ):
+        self.url = f"{base_url.rstrip('/')}/{model_id}"
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.concurrency = max(1, concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Bounds the number of frames held in memory waiting for a worker
+        self._pending = threading.BoundedSemaphore(self.concurrency * 4)
+
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        delay = self.backoff * (2 ** attempt)
+        if response is not None:
+            try:
+                # 503 "model loading" bodies carry an estimated_time hint
+                delay = max(delay, float(response.json().get("estimated_time", 0)))
+            except Exception:
+                pass
+        return min(delay, self.max_backoff)
+
+    def score_bytes(self, img_bytes: bytes):
+        """
+        Score one encoded image.
+        Returns:
+            fake_score [0..1], or None if the call failed or the circuit is open.
+        """
+        if not self.breaker.allow():
+            return None
+
+        try:
+            return self._score_bytes(img_bytes)
+        except BaseException:
+            self.breaker.record_failure()  # a trial call must always settle the breaker
+            raise
+
+    def _score_bytes(self, img_bytes: bytes):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=img_bytes, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning("HF API request failed: %s", e)
+                if attempt < self.max_retries and not self.breaker.is_open:
+                    time.sleep(self._retry_delay(attempt))
+                    continue
+                break
+
+            if response.status_code == 200:
+                try:
+                    score = parse_fake_score(response.json())
+                except ValueError:
+                    score = None
+                if score is not None:
+                    self.breaker.record_success()
+                    return score
+                logger.warning("Unexpected HF API response %s: %s", response.status_code, response.text[:200])
+                break
+
+            if response.status_code in (429, 503) and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+
+            logger.warning("Unexpected HF API response %s: %s", response.status_code, response.text[:200])
+            break
+
+        self.breaker.record_failure()
+        return None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="hf-api"
+                )
+            return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Run fn(*args) on the client's worker pool.
+        Blocks when too many calls are queued, so callers get backpressure.
+        """
+        self._pending.acquire()
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._pending.release()
+            raise
+        fut.add_done_callback(lambda _: self._pending.release())
+        return fut
+
+
+remote_client = HFRemoteClient(
+    base_url=settings.HF_API_URL,
+    model_id=settings.HF_DEEPFAKE_MODEL or "umarbutler/deepfake-detection",
+    token=settings.HF_TOKEN,
+    concurrency=settings.HF_API_CONCURRENCY,
+    timeout=settings.HF_API_TIMEOUT,
+    max_retries=settings.HF_API_MAX_RETRIES,
+    breaker=CircuitBreaker(
+        threshold=settings.HF_BREAKER_THRESHOLD,
+        reset_after=settings.HF_BREAKER_RESET_SEC,
+    ),
+)
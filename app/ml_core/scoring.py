@@ -0,0 +1,281 @@
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+from statistics import NormalDist
+
+from .detectors import submit_predict_frame, heuristic_predict, detect_faces, locate_faces
+from .hf_model import batcher, model_loaded, PredictionFailed
+from .parallel import frame_executor
+from .phash import dhash, FrameHashIndex, global_frame_index
+from .remote import remote_client
+from ..services.metrics import HF_API_REQUESTS, HEURISTIC_FALLBACKS
+from ..utils.config import settings
+
+# Scores produced without the model: kept out of the frame index and the result cache
+UNCACHED_METHODS = ("heuristic", "failed")
+
+
+class FrameScorer:
+    """
+    Scores a stream of decoded frames for one video job.
+
+    add() never waits on the model: every frame becomes futures on the
+    batcher, the remote client or the frame executor, and finish() resolves
+    them into per-frame result dicts in the original order.
+
+    Stages per frame:
+        1. dHash dedup against earlier frames in this job (and, if FRAME_DEDUP_GLOBAL_SIZE is set, the process-wide index)
+        2. face detection (one Haar pass on a downscaled gray copy)
+        3. scoring: the whole frame, or with face_crops only the face crops
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        use_local: bool = None,
+        face_crops: bool = None,
+        no_face_policy: str = None,
+        dedup: bool = None,
+    ):
+        self.use_local = (
+            settings.VIDEO_SCORER == "local" and model_loaded() if use_local is None else use_local
+        )
+        self.face_crops = settings.FACE_CROPS if face_crops is None else face_crops
+        self.no_face_policy = no_face_policy or settings.NO_FACE_POLICY
+        dedup = settings.FRAME_DEDUP if dedup is None else dedup
+
+        self.results = []
+        self._scoring = {}         # result index -> list of score futures (one per face or frame)
+        self._face_checks = {}     # result index -> future of detect_faces
+        self._detecting = deque()  # (result index, future of locate_faces), face_crops mode
+        self._sources = {}         # result index -> index of the near-identical frame it reuses
+        self._hashes = {}
+        self._unreported = set()   # result indices not yet returned by ready()
+
+        self.dedup = None
+        self.global_index = None
+        self.global_hits = 0
+        if dedup:
+            self.dedup = FrameHashIndex(threshold=settings.FRAME_DEDUP_THRESHOLD, capacity=256)
+            if settings.FRAME_DEDUP_GLOBAL_SIZE > 0:
+                self.global_index = global_frame_index(
+                    model_id, settings.FRAME_DEDUP_THRESHOLD, settings.FRAME_DEDUP_GLOBAL_SIZE
+                )
+
+    # ------------------------------
+    # SUBMISSION
+    # ------------------------------
+    def _submit_score(self, image):
+        # The batcher groups images into micro-batches, the remote client keeps several
+        # requests in flight, and once the API circuit is open the heuristic runs on the
+        # frame executor
+        if self.use_local:
+            return batcher.submit(image)
+        if remote_client.breaker.is_open:
+            HF_API_REQUESTS.inc(result="breaker_open")
+            HEURISTIC_FALLBACKS.inc()
+            return frame_executor.submit(heuristic_predict, image)
+        return submit_predict_frame(image)
+
+    def add(self, name: str, timestamp: float, frame) -> dict:
+        """Queue one decoded frame. Returns its (not yet filled) result dict."""
+        i = len(self.results)
+        result = {
+            "frame": name,
+            "time": round(timestamp, 3),
+            "fake_prob": None,
+            "method": None,
+            "has_face": None
+        }
+        self.results.append(result)
+        self._unreported.add(i)
+
+        # Near-identical frames reuse the result of an earlier one
+        if self.dedup is not None:
+            frame_hash = dhash(frame)
+            source = self.dedup.lookup(frame_hash)
+            if source is not None:
+                self._sources[i] = source
+                result["deduped_from"] = self.results[source]["frame"]
+                return result
+            self.dedup.add(frame_hash, i)
+            self._hashes[i] = frame_hash
+
+            if self.global_index is not None:
+                cached = self.global_index.lookup(frame_hash)
+                if cached is not None:
+                    self.global_hits += 1
+                    result.update(cached)
+                    return result
+
+        if self.face_crops:
+            fut = frame_executor.submit(
+                locate_faces, frame, settings.FACE_CROP_SIZE, self.no_face_policy == "full_frame"
+            )
+            self._detecting.append((i, fut))
+            self._drain_detections(block=False)
+        else:
+            self._scoring[i] = [self._submit_score(frame)]
+            self._face_checks[i] = frame_executor.submit(detect_faces, frame)
+
+        return result
+
+    def _drain_detections(self, block: bool):
+        """Send crops of finished face detections (in frame order) to scoring."""
+        while self._detecting and (block or self._detecting[0][1].done()):
+            i, fut = self._detecting.popleft()
+            boxes, crops = fut.result()
+            result = self.results[i]
+            result["has_face"] = bool(boxes)
+            result["faces"] = [{"box": box} for box in boxes]
+            if crops:
+                self._scoring[i] = [self._submit_score(crop) for crop in crops]
+            else:
+                result["method"] = "no_face"
+
+    # ------------------------------
+    # RESOLUTION
+    # ------------------------------
+    @staticmethod
+    def _score_value(fut):
+        try:
+            value = fut.result()
+        except PredictionFailed:
+            return 0.0, "failed"
+        return value if isinstance(value, tuple) else (value, "hf_local")
+
+    def _resolve_scores(self, i: int, futures):
+        result = self.results[i]
+        scores = [self._score_value(f) for f in futures]
+        if result.get("faces"):
+            for face, (score, method) in zip(result["faces"], scores):
+                face["fake_prob"], face["method"] = score, method
+        # The most suspicious face decides the frame score
+        result["fake_prob"], result["method"] = max(scores, key=lambda s: s[0])
+
+        if self.global_index is not None and i in self._hashes and result["method"] not in UNCACHED_METHODS:
+            self.global_index.add(self._hashes[i], {
+                k: result[k] for k in ("fake_prob", "method", "has_face", "faces") if k in result
+            })
+
+    def _pending(self) -> set:
+        return (
+            set(self._scoring) | set(self._face_checks) | set(self._sources)
+            | {i for i, _ in self._detecting}
+        )
+
+    def _resolve(self, block: bool):
+        """Fill in results whose work has finished (all of it with block=True)."""
+        self._drain_detections(block)
+
+        for i, fut in list(self._face_checks.items()):
+            if block or fut.done():
+                self.results[i]["has_face"] = bool(fut.result())
+                del self._face_checks[i]
+
+        for i, futures in list(self._scoring.items()):
+            if block or all(f.done() for f in futures):
+                self._resolve_scores(i, futures)
+                del self._scoring[i]
+
+        pending = self._pending()
+        for i, source in list(self._sources.items()):
+            if source not in pending:
+                src = self.results[source]
+                self.results[i].update({
+                    k: src[k] for k in ("fake_prob", "method", "has_face", "faces") if k in src
+                })
+                del self._sources[i]
+
+    def finish(self) -> list:
+        """
+        Wait for all outstanding work and return the per-frame results in order.
+        May be called again after adding more frames; only new work is resolved.
+        """
+        self._resolve(block=True)
+        return self.results
+
+    def ready(self) -> list:
+        """
+        Non-blocking: results completed since the last call to ready(), for
+        streaming progress. Completion order, not frame order.
+        """
+        self._resolve(block=False)
+        pending = self._pending()
+        done = sorted(i for i in self._unreported if i not in pending)
+        self._unreported.difference_update(done)
+        return [self.results[i] for i in done]
+
+    def wait(self, timeout: float):
+        """Block until some outstanding work completes (or timeout), then resolve what is done."""
+        futures = [f for fs in self._scoring.values() for f in fs]
+        futures += list(self._face_checks.values()) + [f for _, f in self._detecting]
+        pending = [f for f in futures if not f.done()]
+        if pending:
+            wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        self._resolve(block=False)
+
+    def outstanding(self) -> int:
+        """Frames still waiting on detection or scoring."""
+        return len(self._pending())
+
+    def scores(self) -> list:
+        """Scores of frames that were actually scored (no-face frames may be skipped)."""
+        return [r["fake_prob"] for r in self.results if r["fake_prob"] is not None]
+
+    def dedup_stats(self):
+        if self.dedup is None:
+            return None
+        return {**self.dedup.stats(), "global_hits": self.global_hits}
+
+
+# ------------------------------
+# SEQUENTIAL VERDICT (EARLY EXIT)
+# ------------------------------
+class SequentialTest:
+    """
+    Decides when enough frames have been scored to settle the video verdict.
+
+    After each refinement level the caller passes all frame scores so far.
+    The mean gets a two-sided normal confidence interval; once it lies
+    entirely on one side of `threshold` the verdict cannot flip with more
+    frames (at the chosen error rate) and scoring can stop.
+
+    Repeated looks would inflate the error rate, so check k uses
+    alpha / (k * (k + 1)); these sum to alpha over any number of checks.
+    The sample std is floored at `min_std` so a handful of identical
+    scores does not produce a zero-width interval.
+    """
+
+    def __init__(self, threshold: float = 0.5, alpha: float = 0.05, min_frames: int = 8, min_std: float = 0.05):
+        self.threshold = threshold
+        self.alpha = alpha
+        self.min_frames = max(2, min_frames)
+        self.min_std = min_std
+        self.checks = 0
+        self.state = {"frames": 0, "settled": False}
+
+    def update(self, scores) -> bool:
+        """Record a look at `scores`; True once the verdict is settled."""
+        n = len(scores)
+        if n < self.min_frames:
+            self.state = {"frames": n, "settled": False}
+            return False
+
+        self.checks += 1
+        alpha_k = self.alpha / (self.checks * (self.checks + 1))
+        z = NormalDist().inv_cdf(1 - alpha_k / 2)
+
+        mean = sum(scores) / n
+        std = max(self.min_std, (sum((x - mean) ** 2 for x in scores) / (n - 1)) ** 0.5)
+        half = z * std / n ** 0.5
+
+        settled = mean - half > self.threshold or mean + half < self.threshold
+        self.state = {
+            "frames": n,
+            "mean": round(mean, 4),
+            "lower": round(max(0.0, mean - half), 4),
+            "upper": round(min(1.0, mean + half), 4),
+            "checks": self.checks,
+            "settled": settled,
+        }
+        return settled
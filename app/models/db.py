@@ -1,19 +1,64 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float, JSON
+from contextlib import contextmanager
+from sqlalchemy import (
+    create_engine, event, inspect, Column, Integer, String, DateTime, Float, JSON, Text, Index, LargeBinary, ForeignKey
+)
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 import datetime
 from ..utils.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # -------------------------------------------------------
 # DATABASE ENGINE
 # -------------------------------------------------------
+def _engine_options(url) -> dict:
+    """Pool and driver options for the configured backend."""
+    if url.get_backend_name() == "sqlite":
+        options = {
+            # Sessions cross threads (FastAPI threadpool, job dispatcher); the
+            # timeout is how long a writer waits on the lock before "database is locked"
+            "connect_args": {"check_same_thread": False, "timeout": settings.DB_BUSY_TIMEOUT_SEC},
+        }
+        if url.database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool  # one shared in-memory database
+        else:
+            # SQLAlchemy 1.4 defaults file databases to NullPool (a new connection,
+            # and a re-run of the pragmas, for every session)
+            options.update(
+                poolclass=QueuePool, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW
+            )
+        return options
+
+    # Server databases (Postgres, MySQL): bounded pool, drop dead connections
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SEC,
+        "pool_pre_ping": True,
+    }
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: readers never block the single writer and vice versa;
+    # synchronous=NORMAL is durable in WAL mode except across power loss
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 try:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}  # Required for SQLite + FastAPI
-    )
-    print(f"[DB] Connected successfully → {settings.DATABASE_URL}")
+    _url = make_url(settings.DATABASE_URL)
+    engine = create_engine(_url, **_engine_options(_url))
+    if _url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas)
+    logger.info("Connected successfully → %s", _url.render_as_string(hide_password=True))
 except Exception as e:
-    print("[DB ERROR] Failed to initialize engine:", e)
+    logger.error("Failed to initialize engine: %s", e)
     engine = None
 
 # -------------------------------------------------------
@@ -25,6 +70,21 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+@contextmanager
+def session_scope():
+    """Short-lived session for one unit of work: commit on success, rollback on error."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 # -------------------------------------------------------
 # BASE CLASS
 # -------------------------------------------------------
@@ -47,10 +107,65 @@ class ScanResult(Base):
     is_fake = Column(Integer, default=0)
     report = Column(JSON, nullable=True)
 
+    # History is read newest-first with keyset pagination on (created_at, id);
+    # each filter gets a composite index that keeps that order
+    __table_args__ = (
+        Index("ix_scan_results_created_id", "created_at", "id"),
+        Index("ix_scan_results_user_created_id", "user", "created_at", "id"),
+        Index("ix_scan_results_fake_created_id", "is_fake", "created_at", "id"),
+        Index("ix_scan_results_score", "authenticity_score"),
+    )
+
     def __repr__(self):
         return f"<ScanResult(filename={self.filename}, score={self.authenticity_score}, fake={self.is_fake})>"
 
 
+class ScanSeries(Base):
+    """
+    One packed numeric column of a scan's per-frame or per-segment results,
+    e.g. "frames.fake_prob" as little-endian float32 (see app/services/series.py).
+    Kept out of ScanResult.report so history and report reads never parse it;
+    ranges are read with substr() on `data` without loading the whole array.
+    """
+    __tablename__ = "scan_series"
+
+    scan_id = Column(Integer, ForeignKey("scan_results.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(32), primary_key=True)
+    dtype = Column(String(8))      # numpy dtype string, e.g. "<f4"
+    itemsize = Column(Integer)     # bytes per element, for range reads in SQL
+    length = Column(Integer)
+    data = Column(LargeBinary)
+
+    def __repr__(self):
+        return f"<ScanSeries(scan_id={self.scan_id}, name={self.name}, length={self.length})>"
+
+
+class AnalysisJob(Base):
+    """
+    Durable queue entry for a video analysis job.
+    status: queued → running → done | failed
+    """
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(32), primary_key=True)
+    filename = Column(String)
+    video_path = Column(String)
+    content_hash = Column(String(64), nullable=True)
+    options = Column(JSON, nullable=True)  # per-request pipeline options (frame sampling)
+    status = Column(String(16), default="queued", index=True)
+    owner = Column(String, nullable=True)  # "host:pid" of the dispatcher running it
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    scan_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # lease: refreshed by the owning dispatcher while running
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<AnalysisJob(id={self.id}, filename={self.filename}, status={self.status})>"
+
+
 # -------------------------------------------------------
 # UTILITY: GET DB SESSION
 # -------------------------------------------------------
@@ -65,9 +180,28 @@ def get_db():
 # -------------------------------------------------------
 # INITIALIZE DATABASE
 # -------------------------------------------------------
+def _add_missing_columns():
+    """create_all leaves existing tables alone; add nullable columns introduced since."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}')
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
 def init_db():
     try:
         Base.metadata.create_all(bind=engine)
-        print("[DB] Tables created successfully.")
+        _add_missing_columns()
+        # create_all skips indexes of tables that already exist, add any missing ones
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        logger.info("Tables created successfully.")
     except Exception as e:
-        print("[DB ERROR] Failed to create tables:", e)
+        logger.error("Failed to create tables: %s", e)
@@ -28,6 +28,7 @@ class ScanRead(BaseModel):
     created_at: datetime.datetime
     authenticity_score: float
     is_fake: int
+    heatmap: Optional[str] = None  # report["heatmap"], also present without the report
     report: Optional[Any] = None
 
     class Config:
@@ -40,13 +41,19 @@ class ScanRead(BaseModel):
                 "created_at": "2025-11-22T12:30:00",
                 "authenticity_score": 78.52,
                 "is_fake": 1,
+                "heatmap": "./uploads/sample.mp4_heatmap.jpg",
                 "report": {
-                    "audio": "./uploads/sample_audio.wav",
-                    "frames_sample": [
-                        {"frame": "frame_00001.jpg", "fake_prob": 0.72, "method": "hf_api", "has_face": True}
-                    ],
-                    "heatmap": "./uploads/sample_heatmap.jpg",
-                    "frame_scores": [0.72, 0.68, 0.80]
+                    "audio": None,
+                    "audio_features": {"energy": 0.0078, "zcr": 0.0375, "fake_score": 81.6, "status": "analyzed"},
+                    "heatmap": "./uploads/sample.mp4_heatmap.jpg",
+                    "top_frames": [{"frame": "frame_00003.jpg", "time": 3.0, "fake_prob": 0.8}],
+                    "frames_used": 10,
+                    "audio_segments": 9,
+                    "sampling": {"fps": 1.0, "max_frames": 0, "strategy": "interval", "seek": False},
+                    "timings": {"decode_score": 1.42, "score_drain": 0.05, "store": 0.01, "total": 1.51},
+                    # Per-frame scores and audio segments are paged from these, not stored in the report
+                    "frames_url": "/scans/1/frames",
+                    "audio_url": "/scans/1/audio"
                 }
             }
         }
@@ -57,7 +64,8 @@ class ScanRead(BaseModel):
 # -------------------------------------------------------
 class ScanHistoryResponse(BaseModel):
     history: List[ScanRead]
-    total: int
+    total: int  # records on this page
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next (older) page
 
     class Config:
         json_schema_extra = {
@@ -71,7 +79,39 @@ class ScanHistoryResponse(BaseModel):
                         "created_at": "2025-11-22T09:40:00"
                     }
                 ],
-                "total": 1
+                "total": 1,
+                "next_cursor": "MjAyNS0xMS0yMlQwOTo0MDowMHwx"
             }
         }
 
+
+
+# -------------------------------------------------------
+# JOB STATUS SCHEMA (used by /jobs/{id})
+# -------------------------------------------------------
+class JobRead(BaseModel):
+    id: str
+    filename: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    scan_id: Optional[int] = None
+    created_at: datetime.datetime
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+
+    class Config:
+        orm_mode = True
+        schema_extra = {
+            "example": {
+                "id": "5f1c9a7e2b6d4e0f8a3c1b2d4e6f8a0c",
+                "filename": "sample_video.mp4",
+                "status": "running",
+                "attempts": 1,
+                "error": None,
+                "scan_id": None,
+                "created_at": "2025-11-22T12:30:00",
+                "started_at": "2025-11-22T12:30:02",
+                "finished_at": None
+            }
+        }
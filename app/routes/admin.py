@@ -1,42 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from ..models.db import ScanResult, get_db
 from ..models.schemas import ScanHistoryResponse
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Columns returned by default; the report JSON is only read with include_report=true,
+# apart from the heatmap path the bundled frontend links to (extracted in the database)
+SUMMARY_COLUMNS = (
+    ScanResult.id,
+    ScanResult.filename,
+    ScanResult.user,
+    ScanResult.created_at,
+    ScanResult.authenticity_score,
+    ScanResult.is_fake,
+    ScanResult.report["heatmap"].as_string().label("heatmap"),
+)
+
+
+# -------------------------------------------------------
+# KEYSET CURSOR
+# -------------------------------------------------------
+def encode_cursor(created_at: datetime.datetime, scan_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{scan_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Returns (created_at, id) of the last row of the previous page."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, scan_id = raw.rsplit("|", 1)
+        return datetime.datetime.fromisoformat(created_at), int(scan_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
 @router.get("/history", response_model=ScanHistoryResponse)
-def list_history(limit: int = 50, db: Session = Depends(get_db)):
+def list_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    user: Optional[str] = None,
+    is_fake: Optional[int] = Query(None, ge=0, le=1),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    include_report: bool = False,
+    db: Session = Depends(get_db),
+):
     """
-    Returns the latest deepfake analysis history (video/image/audio scans).
-    - limit: number of records to return (default = 50)
+    Returns the deepfake analysis history (video/image/audio scans), newest first.
+    - limit: number of records per page (default = 50, max = 500)
+    - cursor: next_cursor from the previous page; pages never skip or repeat
+      rows, and the cost of a page does not grow with how deep it is
+    - user / is_fake / min_score / max_score: filters
+    - include_report: also return the full report JSON (large, off by default)
     """
+    if min_score is not None and max_score is not None and min_score > max_score:
+        raise HTTPException(status_code=400, detail="min_score must be <= max_score")
+
     try:
-        # Fetch recent scan results
-        items = (
-            db.query(ScanResult)
-            .order_by(ScanResult.created_at.desc())
-            .limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        columns = SUMMARY_COLUMNS + (ScanResult.report,) if include_report else SUMMARY_COLUMNS
+        query = db.query(*columns)
+
+        if user is not None:
+            query = query.filter(ScanResult.user == user)
+        if is_fake is not None:
+            query = query.filter(ScanResult.is_fake == is_fake)
+        if min_score is not None:
+            query = query.filter(ScanResult.authenticity_score >= min_score)
+        if max_score is not None:
+            query = query.filter(ScanResult.authenticity_score <= max_score)
+        if after is not None:
+            # Row-value comparison, so the (created_at, id) index serves it as a range scan
+            query = query.filter(tuple_(ScanResult.created_at, ScanResult.id) < tuple_(*after))
+
+        rows = (
+            query.order_by(ScanResult.created_at.desc(), ScanResult.id.desc())
+            .limit(limit + 1)
             .all()
         )
 
-        if not items:
-            raise HTTPException(status_code=404, detail="No analysis records found")
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         results = [
             {
-                "id": i.id,
-                "filename": i.filename,
-                "authenticity_score": i.authenticity_score,
-                "is_fake": i.is_fake,
-                "created_at": i.created_at.isoformat(),
-                "user": i.user,
+                "id": r.id,
+                "filename": r.filename,
+                "authenticity_score": r.authenticity_score,
+                "is_fake": r.is_fake,
+                "created_at": r.created_at.isoformat(),
+                "user": r.user,
+                "heatmap": r.heatmap,
+                "report": r.report if include_report else None,
             }
-            for i in items
+            for r in rows
         ]
 
-        return {"history": results, "total": len(results)}
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        return {"history": results, "total": len(results), "next_cursor": next_cursor}
 
     except Exception as e:
-        print("[ADMIN HISTORY ERROR]:", str(e))
+        logger.exception("History query failed: %s", e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
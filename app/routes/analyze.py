@@ -1,55 +1,315 @@
 import os
-import shutil
-from fastapi import APIRouter, UploadFile, BackgroundTasks, HTTPException
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from app.models.db import SessionLocal, ScanResult
-from app.ml_core.frames import extract_frames
-from app.ml_core.audio import extract_audio_from_video
-from app.ml_core.heatmap import create_heatmap_from_scores
-from app.ml_core.detectors import predict_frame, detect_face_presence
+from app.models.db import ScanResult, ScanSeries, session_scope
+from app.ml_core.frames import (
+    iter_frames, iter_frames_coarse_to_fine, prefetch_frames, frame_name, save_frame, SAMPLING_STRATEGIES
+)
+from app.ml_core.audio import iter_audio_chunks
+from app.ml_core.heatmap import create_heatmap_from_scores, render_face_heat
+from app.ml_core.scoring import FrameScorer, SequentialTest, UNCACHED_METHODS
 from app.utils.config import settings
-from app.ml_core.hf_model import hf_predict_image
-from app.utils.audio_utils import analyze_audio_features
+from app.ml_core.hf_model import batcher, model_loading, local_model_id
+from app.utils.audio_utils import StreamingAudioAnalyzer, score_at
+from app.services.storage import ingest_upload, UploadRejected
+from app.services.cache import result_cache, cache_key
+from app.services.jobs import enqueue_video_job
+from app.services.series import scan_series_rows
+from app.services.batch import BatchReader, BatchLimitExceeded, decode_image
+from app.services.admission import Overloaded, image_executor, audio_executor
+from app.services.metrics import StageTimer, JOB_FRAMES, timed_endpoint
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
 UPLOAD_DIR = settings.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Bump whenever pipeline changes would alter results, so cached reports are not reused
+PIPELINE_VERSION = "2.3.0"
+AUDIO_ANALYZER_ID = "librosa-heuristic-windowed"
+
+
+def video_model_id() -> str:
+    model_id = f"{settings.VIDEO_SCORER}:{settings.HF_DEEPFAKE_MODEL}"
+    if settings.VIDEO_SCORER == "local" and settings.MODEL_BACKEND != "torch":
+        model_id += f":{settings.MODEL_BACKEND}"
+    if settings.FACE_CROPS:
+        model_id += f":faces{settings.FACE_CROP_SIZE}:{settings.NO_FACE_POLICY}"
+    return model_id
+
+
+def sampling_options(fps: float = None, max_frames: int = None, strategy: str = None, seek: bool = None) -> dict:
+    """Per-request frame sampling policy, falling back to the Settings defaults."""
+    options = {
+        "fps": fps if fps is not None else settings.FRAME_SAMPLE_FPS,
+        "max_frames": max_frames if max_frames is not None else settings.FRAME_MAX_FRAMES,
+        "strategy": strategy or settings.FRAME_SAMPLING,
+        "seek": seek if seek is not None else settings.FRAME_SEEK,
+    }
+    if options["fps"] <= 0:
+        raise ValueError("fps must be positive")
+    options["fps"] = min(options["fps"], settings.MAX_SAMPLE_FPS)
+    if options["max_frames"] < 0:
+        raise ValueError("max_frames must be >= 0 (0 = no limit)")
+    if options["strategy"] not in SAMPLING_STRATEGIES:
+        raise ValueError(f"strategy must be one of {', '.join(SAMPLING_STRATEGIES)}")
+    if options["strategy"] == "uniform" and not options["max_frames"]:
+        raise ValueError("uniform sampling needs max_frames")
+    return options
+
+
+def video_cache_key(content_hash: str, sampling: dict) -> str:
+    model_id = f"{video_model_id()}|{json.dumps(sampling, sort_keys=True)}"
+    return cache_key(content_hash, "video", model_id, PIPELINE_VERSION)
+
 
 # -------------------------------------------------------
 # BACKGROUND VIDEO ANALYSIS PIPELINE
 # -------------------------------------------------------
-def run_full_pipeline(video_path: str, db: Session, filename: str):
+def audio_analyzer(hop_seconds: float = None) -> StreamingAudioAnalyzer:
+    hop = hop_seconds or settings.AUDIO_HOP_SEC
+    return StreamingAudioAnalyzer(
+        segment_seconds=max(settings.AUDIO_SEGMENT_SEC, hop),
+        hop_seconds=hop,
+    )
+
+
+def _audio_stage(video_path: str, audio_path: str, hop_seconds: float):
+    """
+    Stream the audio track from ffmpeg through the windowed analyzer.
+    The WAV file is only written when SAVE_AUDIO_WAV is set.
+    Returns (wav path or None, summary features or None, segment timeline, seconds).
+    """
+    started = time.perf_counter()
+    wav_path = audio_path if settings.SAVE_AUDIO_WAV else None
+    analyzer = audio_analyzer(hop_seconds)
+    try:
+        for chunk in iter_audio_chunks(video_path, wav_path=wav_path):
+            analyzer.feed(chunk)
+        result = analyzer.finish()
+        audio_features, timeline = result["summary"], result["timeline"]
+        if "error" in audio_features:
+            audio_features, timeline, wav_path = None, [], None
+    except Exception as e:
+        logger.info("No usable audio track: %s", e)
+        audio_features, timeline, wav_path = None, [], None
+    return wav_path, audio_features, timeline, time.perf_counter() - started
+
+
+class _ProgressStream:
+    """
+    Forwards per-frame scores, the running overall score and stage timings
+    to a JobProgress log. A no-op when the pipeline runs without one.
+    """
+
+    def __init__(self, progress, started: float):
+        self.progress = progress
+        self.started = started
+        self.sent = 0
+        self.scored = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def emit(self, event: str, **data):
+        if self.progress is not None:
+            self.progress.emit(event, **data)
+
+    def stage(self, name: str, seconds: float):
+        self.emit("stage", stage=name, seconds=round(seconds, 3))
+
+    def frames(self, scorer, decoded: int, force: bool = False):
+        """Send frames scored since the last call, at most every PROGRESS_INTERVAL_SEC."""
+        if self.progress is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self.last < settings.PROGRESS_INTERVAL_SEC:
+            return
+        self.last = now
+
+        finished = scorer.ready()
+        for r in finished:
+            if r["fake_prob"] is not None:
+                self.scored += 1
+                self.total += r["fake_prob"]
+            self.progress.emit("frame", **{k: r.get(k) for k in ("frame", "time", "fake_prob", "method", "has_face")})
+        self.sent += len(finished)
+
+        if finished:
+            self.progress.emit(
+                "progress",
+                frames_decoded=decoded,
+                frames_scored=self.sent,
+                overall_score=round(100 * self.total / self.scored, 2) if self.scored else None,
+                elapsed_seconds=round(now - self.started, 3),
+            )
+
+    def drain(self, scorer, decoded: int):
+        """
+        Wait for the scorer's outstanding work, streaming frames as they complete.
+        Returns as soon as the last result lands; only the events are batched.
+        """
+        if self.progress is None:
+            return
+        while True:
+            self.frames(scorer, decoded)
+            if not scorer.outstanding():
+                break
+            scorer.wait(settings.PROGRESS_INTERVAL_SEC)
+        self.frames(scorer, decoded, force=True)
+
+
+def _store_scan(db: Session, filename: str, score: float, is_fake: int, report: dict, frame_results, audio_timeline):
+    """
+    Insert the ScanResult and its packed series in one transaction.
+    The series go in as a single executemany. Returns (scan id, final report).
+    """
+    record = ScanResult(
+        filename=filename,
+        user="anonymous",
+        authenticity_score=score,
+        is_fake=is_fake,
+        report=report
+    )
+    db.add(record)
+    db.flush()  # assigns record.id for the series rows
+    report = {**report, "frames_url": f"/scans/{record.id}/frames", "audio_url": f"/scans/{record.id}/audio"}
+    record.report = report
+    db.execute(ScanSeries.__table__.insert(), scan_series_rows(record.id, frame_results, audio_timeline))
+    db.commit()
+    return record.id, report
+
+
+def _update_report(db: Session, scan_id: int, report: dict):
+    db.query(ScanResult).filter(ScanResult.id == scan_id).update(
+        {ScanResult.report: report}, synchronize_session=False
+    )
+    db.commit()
+
+
+def run_full_pipeline(
+    video_path: str,
+    db: Session = None,
+    filename: str = None,
+    content_hash: str = None,
+    sampling: dict = None,
+    progress=None,
+):
+    """
+    Analyze a video end to end and store a ScanResult.
+    `db` is optional: by default a session is opened only for the final write, so
+    long jobs do not hold a connection (or SQLite's write lock) while scoring.
+    `sampling` is a sampling_options() dict; Settings defaults are used when omitted.
+    `progress` is an optional JobProgress that receives frame scores and stage timings as they happen.
+    Returns the new ScanResult id, or None if no frames could be extracted.
+    """
     try:
-        print(f"[PIPELINE] Starting analysis for {filename}")
+        sampling = sampling or sampling_options()
+        logger.info("Starting analysis for %s", filename)
 
-        # 1️⃣ Extract audio
+        started = time.perf_counter()
+        stage_seconds = {}  # elapsed since start at each milestone (also streamed as "stage" events)
+        timer = StageTimer()  # per-stage durations, exported to /metrics and stored as report["timings"]
+        stream = _ProgressStream(progress, started)
+        stream.emit("started", filename=filename, sampling=sampling)
+
+        # 1️⃣ Audio stage runs alongside frame decoding and scoring
         audio_path = video_path + "_audio.wav"
-        extracted_audio = extract_audio_from_video(video_path, audio_path)
+        audio_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        # Audio segments hop at the frame sampling interval so the two timelines line up,
+        # but no finer than AUDIO_HOP_SEC (score_at() maps frames to the nearest segment)
+        audio_hop = max(1.0 / sampling["fps"], settings.AUDIO_HOP_SEC)
+        audio_future = audio_pool.submit(_audio_stage, video_path, audio_path, audio_hop)
+        audio_pool.shutdown(wait=False)
 
-        # 2️⃣ Extract frames
+        # 2️⃣ + 3️⃣ Decode in a background thread, score frames as soon as they arrive
         frames_dir = video_path + "_frames"
-        frames = extract_frames(video_path, frames_dir, fps=1)
+        frames = []
+        scorer = FrameScorer(model_id=video_model_id())
+
+        adaptive = sampling["strategy"] == "adaptive"
+        if adaptive:
+            # Coarse-to-fine levels; after each level the sequential test may settle the verdict
+            source = iter_frames_coarse_to_fine(
+                video_path,
+                fps=sampling["fps"],
+                max_frames=sampling["max_frames"] or None,
+                first_pass=settings.EARLY_EXIT_FIRST_PASS,
+            )
+            sequential = SequentialTest(
+                alpha=settings.EARLY_EXIT_ALPHA,
+                min_frames=settings.EARLY_EXIT_FIRST_PASS,
+                min_std=settings.EARLY_EXIT_MIN_STD,
+            )
+        else:
+            source = (
+                (0, index, timestamp, frame)
+                for index, timestamp, frame in iter_frames(
+                    video_path,
+                    fps=sampling["fps"],
+                    max_frames=sampling["max_frames"] or None,
+                    strategy=sampling["strategy"],
+                    seek=sampling["seek"],
+                )
+            )
+
+        decoded = prefetch_frames(source, maxsize=settings.FRAME_QUEUE_SIZE)
+        level, stop_reason = 0, None
+        for frame_level, index, timestamp, frame in decoded:
+            if frame_level != level:
+                level = frame_level
+                stream.drain(scorer, len(frames))
+                scorer.finish()
+                if sequential.update(scorer.scores()):
+                    stop_reason = "settled"
+                    break
+                budget = settings.EARLY_EXIT_MAX_SECONDS
+                if budget and time.perf_counter() - started > budget:
+                    stop_reason = "time_budget"
+                    break
+
+            if settings.SAVE_FRAMES:
+                save_frame(frame, frames_dir, index)
+
+            frames.append(frame_name(index))
+            scorer.add(frame_name(index), timestamp, frame)
+            stream.frames(scorer, len(frames))
+        decoded.close()  # stops the decoder thread after an early exit
+        stage_seconds["decode"] = time.perf_counter() - started
+        timer.add("decode_score", stage_seconds["decode"])
+        stream.stage("decode", stage_seconds["decode"])
 
         if not frames:
-            print("⚠️ No frames extracted — skipping analysis.")
-            return
+            logger.warning("No frames extracted — skipping analysis of %s", filename)
+            return None
+
+        # Adaptive mode scores out of order; the report and heatmap are in time order
+        with timer.stage("score_drain"):
+            stream.drain(scorer, len(frames))
+            frame_results = sorted(scorer.finish(), key=lambda r: r["time"])
+        JOB_FRAMES.observe(len(frame_results))
+        frames = [r["frame"] for r in frame_results]
+        frame_scores = [r["fake_prob"] for r in frame_results if r["fake_prob"] is not None]
+        stage_seconds["frames"] = time.perf_counter() - started
+        stream.stage("frames", stage_seconds["frames"])
 
-        frame_scores = []
-        frame_results = []
-
-        # 3️⃣ Analyze each frame
-        for frame_path in frames:
-            score, method = predict_frame(frame_path)
-            has_face = detect_face_presence(frame_path)
-            frame_scores.append(score)
-            frame_results.append({
-                "frame": os.path.basename(frame_path),
-                "fake_prob": score,
-                "method": method,
-                "has_face": has_face
-            })
+        early_exit = None
+        if adaptive:
+            if stop_reason is None:
+                sequential.update(scorer.scores())
+                budget_hit = sampling["max_frames"] and len(frames) >= sampling["max_frames"]
+                stop_reason = "frame_budget" if budget_hit else "exhausted"
+            early_exit = {"reason": stop_reason, "levels": level + 1, **sequential.state}
+            logger.info("Adaptive sampling stopped (%s) after %d frames", stop_reason, len(frames))
 
         # 4️⃣ Compute authenticity score
         overall_score = float(100 * (sum(frame_scores) / len(frame_scores))) if frame_scores else 0.0
@@ -57,88 +317,382 @@ def run_full_pipeline(video_path: str, db: Session, filename: str):
 
         # 5️⃣ Generate HEATMAP
         heatmap_path = os.path.join(UPLOAD_DIR, f"{os.path.basename(video_path)}_heatmap.jpg")
-        create_heatmap_from_scores(frames, frame_scores, heatmap_path)
+        with timer.stage("heatmap"):
+            create_heatmap_from_scores(frames, frame_scores, heatmap_path)
 
-        # 6️⃣ Analyze audio features (optional)
-        audio_features = None
-        if extracted_audio and os.path.exists(extracted_audio):
-            audio_features = analyze_audio_features(extracted_audio)
+        # Face-box heat on the most suspicious saved frames
+        face_heat = []
+        if scorer.face_crops and settings.SAVE_FRAMES:
+            with timer.stage("face_heat"):
+                with_faces = [r for r in frame_results if r.get("faces") and r["fake_prob"] is not None]
+                for r in sorted(with_faces, key=lambda r: r["fake_prob"], reverse=True)[:5]:
+                    out = render_face_heat(
+                        os.path.join(frames_dir, r["frame"]),
+                        r["faces"],
+                        os.path.join(frames_dir, r["frame"].replace(".jpg", "_faces.jpg")),
+                    )
+                    if out:
+                        face_heat.append(out)
 
-        # 7️⃣ Build report
+        # 6️⃣ Collect the audio stage (ffmpeg PCM stream + features)
+        with timer.stage("audio_wait"):
+            extracted_audio, audio_features, audio_timeline, stage_seconds["audio"] = audio_future.result()
+        timer.add("audio", stage_seconds["audio"])  # ran in its own thread, overlapping decode_score
+        stream.stage("audio", stage_seconds["audio"])
+        for r in frame_results:
+            r["audio_score"] = score_at(audio_timeline, r["time"])
+        stage_seconds["total"] = time.perf_counter() - started
+
+        # 7️⃣ Build report (summary only; per-frame and per-segment data is packed separately)
+        top_frames = sorted(
+            (r for r in frame_results if r["fake_prob"] is not None),
+            key=lambda r: r["fake_prob"],
+            reverse=True,
+        )[:5]
         report = {
             "audio": extracted_audio,
             "audio_features": audio_features,
-            "frames_sample": frame_results[:20],
             "heatmap": heatmap_path,
-            "frame_scores": frame_scores
+            "face_heat": face_heat,
+            "top_frames": [{k: r[k] for k in ("frame", "time", "fake_prob")} for r in top_frames],
+            "frames_used": len(frame_results),
+            "audio_segments": len(audio_timeline),
+            "early_exit": early_exit,
+            "sampling": sampling,
+            "stage_seconds": {k: round(v, 3) for k, v in stage_seconds.items()},
+            "timings": timer.report(),
+            "dedup": scorer.dedup_stats(),
+            "faces_found": sum(len(r.get("faces") or []) for r in frame_results) if scorer.face_crops else None,
         }
 
-        # 8️⃣ Save to DB
-        record = ScanResult(
-            filename=filename,
-            user="anonymous",
+        # 8️⃣ Save to DB (the only point where the job holds a session)
+        with timer.stage("store"):
+            if db is not None:
+                scan_id, report = _store_scan(db, filename, overall_score, is_fake, report, frame_results, audio_timeline)
+            else:
+                with session_scope() as write_db:
+                    scan_id, report = _store_scan(
+                        write_db, filename, overall_score, is_fake, report, frame_results, audio_timeline
+                    )
+        timer.add("total", time.perf_counter() - started)
+
+        # store and total only exist once the scan is written; one small update records them
+        report = {**report, "timings": timer.report()}
+        if db is not None:
+            _update_report(db, scan_id, report)
+        else:
+            with session_scope() as write_db:
+                _update_report(write_db, scan_id, report)
+        logger.info("Scan completed — ID %s", scan_id)
+        stream.emit(
+            "result",
+            scan_id=scan_id,
             authenticity_score=overall_score,
             is_fake=is_fake,
-            report=report
+            frames_used=len(frame_results),
+            stage_seconds=report["stage_seconds"],
         )
-        db.add(record)
-        db.commit()
-        db.refresh(record)
-        print(f"✅ SCAN COMPLETED — ID: {record.id}")
+
+        # Heuristic fallbacks and failed frames mean the model was unreachable, do not pin them in the cache
+        if content_hash and all(r["method"] not in UNCACHED_METHODS for r in frame_results):
+            result_cache.put(
+                video_cache_key(content_hash, sampling),
+                {
+                    "scan_id": scan_id,
+                    "authenticity_score": overall_score,
+                    "is_fake": is_fake,
+                    "report": report,
+                },
+            )
+
+        return scan_id
 
     except Exception as e:
-        print("❌ PIPELINE FAILED:", e)
+        logger.exception("Pipeline failed for %s: %s", filename, e)
         raise e
 
     finally:
-        db.close()
+        if db is not None:
+            db.close()
 
 
 # -------------------------------------------------------
 # VIDEO ANALYSIS ENDPOINT
 # -------------------------------------------------------
 @router.post("/analyze/video")
-async def analyze_video(file: UploadFile, background_tasks: BackgroundTasks):
+@timed_endpoint("analyze_video")
+async def analyze_video(
+    file: UploadFile,
+    fps: Optional[float] = None,
+    max_frames: Optional[int] = None,
+    sampling: Optional[str] = None,
+    seek: Optional[bool] = None,
+):
+    """
+    Upload a video and queue it for analysis.
+    Optional query params tune frame sampling for this request:
+    - fps: frames sampled per second (default = FRAME_SAMPLE_FPS, capped at MAX_SAMPLE_FPS)
+    - max_frames: cap on analyzed frames, 0 = no cap
+    - sampling: interval / uniform / scene / adaptive (coarse-to-fine, stops once the
+      verdict is statistically settled; max_frames is then the frame budget)
+    - seek: jump between samples instead of decoding through gaps
+    """
     try:
-        out_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(out_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        options = sampling_options(fps, max_frames, sampling, seek)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        db = SessionLocal()
-        background_tasks.add_task(run_full_pipeline, out_path, db, file.filename)
+    try:
+        out_path, content_hash = await ingest_upload(file, "video")
 
-        return {"message": "Video uploaded successfully — processing started.", "file_saved_as": out_path}
+        cached = result_cache.get(video_cache_key(content_hash, options))
+        if cached is not None:
+            return {
+                "message": "Video already analyzed — returning cached result.",
+                "filename": file.filename,
+                "file_saved_as": out_path,
+                "cached": True,
+                **cached,
+            }
+
+        job_id = enqueue_video_job(out_path, file.filename, content_hash, options)
+
+        return {
+            "message": "Video uploaded successfully — processing queued.",
+            "filename": file.filename,
+            "file_saved_as": out_path,
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+            "events_url": f"/jobs/{job_id}/events",
+        }
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Video analysis failed: {e}")
 
 
+# -------------------------------------------------------
+# ADMISSION CONTROL
+# -------------------------------------------------------
+def _admit_image_request():
+    """503 while the model is loading, 429 when the image executor is full."""
+    if model_loading():
+        retry = settings.MODEL_LOADING_RETRY_AFTER_SEC
+        raise Overloaded("Model is loading, retry later", retry, status_code=503)
+    image_executor.check()
+
+
+def _overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+
+
 # -------------------------------------------------------
 # IMAGE ANALYSIS ENDPOINT
 # -------------------------------------------------------
+def _score_image(path: str, content_hash: str) -> dict:
+    """Blocking part of /analyze/image (cache lookup, batched inference); runs on image_executor."""
+    key = cache_key(content_hash, "image", local_model_id(), PIPELINE_VERSION)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return {"cached": True, **cached}
+
+    # Raises PredictionFailed rather than scoring 0.0, so failures never reach the cache
+    fake_prob = batcher.predict(path)
+    result = {"fake_prob_percent": round(fake_prob * 100, 2)}
+    result_cache.put(key, result)
+    return result
+
+
 @router.post("/analyze/image")
+@timed_endpoint("analyze_image")
 async def analyze_image(file: UploadFile):
+    """
+    Score one image. Inference runs on a bounded executor, never on the event
+    loop; when it is saturated the request gets 429 with Retry-After
+    (503 while the model is still loading).
+    """
     try:
-        path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(path, "wb") as f:
-            f.write(await file.read())
-
-        fake_prob = hf_predict_image(path)
-        return {"filename": file.filename, "fake_prob_percent": round(fake_prob * 100, 2)}
+        _admit_image_request()  # before the upload is written to disk
+        path, content_hash = await ingest_upload(file, "image")
+        result = await image_executor.run(_score_image, path, content_hash)
+        return {"filename": file.filename, **result}
+    except Overloaded as e:
+        raise _overloaded(e)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {e}")
 
 
+# -------------------------------------------------------
+# BATCH IMAGE ANALYSIS ENDPOINT
+# -------------------------------------------------------
+def _stream_image_batch(files: list):
+    """
+    NDJSON lines: one result (or error) per image as its micro-batch completes,
+    then a summary. Images are decoded in memory and go through the shared
+    batcher, so the model sees full HF_BATCH_SIZE batches; cached and repeated
+    images (same content) are not scored again.
+    """
+    started = time.perf_counter()
+    model_id = local_model_id()
+    max_in_flight = settings.HF_BATCH_SIZE * 4  # bounds decoded images held in memory
+    pending = deque()
+    scoring = {}  # content hash → Future, dedups repeats within the batch
+    counts = {"images": 0, "scored": 0, "cached": 0, "errors": 0}
+
+    def result_line(index, filename, key, fut):
+        try:
+            fake_prob = fut.result()
+        except Exception as e:
+            return error_line(index, filename, f"Scoring failed: {e}")
+        result = {"fake_prob_percent": round(fake_prob * 100, 2)}  # failed images raised above
+        result_cache.put(key, result)
+        counts["scored"] += 1
+        return json.dumps({"type": "result", "index": index, "filename": filename, **result}) + "\n"
+
+    def error_line(index, filename, detail):
+        counts["errors"] += 1
+        return json.dumps({"type": "error", "index": index, "filename": filename, "detail": detail}) + "\n"
+
+    try:
+        for item in BatchReader().items(files):
+            counts["images"] += 1
+            if item.error:
+                yield error_line(item.index, item.filename, item.error)
+                continue
+
+            digest = item.content_hash
+            key = cache_key(digest, "image", model_id, PIPELINE_VERSION)
+            cached = result_cache.get(key)
+            if cached is not None:
+                counts["cached"] += 1
+                yield json.dumps({"type": "result", "index": item.index, "filename": item.filename,
+                                  "cached": True, **cached}) + "\n"
+                continue
+
+            fut = scoring.get(digest)
+            if fut is None:
+                try:
+                    image = decode_image(item.data)
+                except Exception as e:
+                    logger.debug("Could not decode %s: %s", item.filename, e)
+                    yield error_line(item.index, item.filename, "Could not decode image")
+                    continue
+                fut = scoring[digest] = batcher.submit(image)
+            pending.append((item.index, item.filename, key, fut))
+
+            # Emit finished results in order; wait on the oldest once the window is full
+            while pending and (pending[0][3].done() or len(pending) >= max_in_flight):
+                yield result_line(*pending.popleft())
+
+    except BatchLimitExceeded as e:
+        # Images read before the limit still get their results
+        yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+    except Exception as e:
+        yield json.dumps({"type": "error", "detail": f"Batch analysis failed: {e}"}) + "\n"
+
+    while pending:
+        yield result_line(*pending.popleft())
+
+    yield json.dumps({"type": "summary", **counts, "seconds": round(time.perf_counter() - started, 3)}) + "\n"
+
+
+@router.post("/analyze/images/batch")
+@timed_endpoint("analyze_images_batch")
+async def analyze_images_batch(files: List[UploadFile] = File(...)):
+    """
+    Score many images in one request.
+    `files` may hold images and/or zip/tar(.gz) archives of images. Nothing is
+    written to the upload directory. The response is newline-delimited JSON:
+    {"type": "result", "index", "filename", "fake_prob_percent"[, "cached"]} or
+    {"type": "error", ...} per image as its batch finishes, then a "summary" line.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    try:
+        # A batch holds one image slot while it streams
+        _admit_image_request()
+        image_executor.acquire()
+    except Overloaded as e:
+        raise _overloaded(e)
+    return StreamingResponse(
+        _stream_image_batch(files),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(image_executor.release),  # runs after the stream, also on disconnect
+    )
+
+
 # -------------------------------------------------------
 # AUDIO ANALYSIS ENDPOINT
 # -------------------------------------------------------
+def _stream_audio_segments(path: str, filename: str):
+    """NDJSON lines: one per analyzed segment as it completes, then the summary."""
+    analyzer = audio_analyzer()
+    try:
+        for chunk in iter_audio_chunks(path):
+            for segment in analyzer.feed(chunk):
+                yield json.dumps({"type": "segment", **segment}) + "\n"
+        before = len(analyzer.timeline)
+        result = analyzer.finish()
+        for segment in result["timeline"][before:]:
+            yield json.dumps({"type": "segment", **segment}) + "\n"
+        yield json.dumps({"type": "summary", "filename": filename, "audio_features": result["summary"]}) + "\n"
+    except Exception as e:
+        yield json.dumps({"type": "error", "detail": f"Audio analysis failed: {e}"}) + "\n"
+
+
+def _audio_features(path: str, content_hash: str) -> dict:
+    """
+    Blocking part of /analyze/audio (cache lookup, librosa); runs on audio_executor.
+    Same streaming decode and windowed analyzer as stream=true, so the
+    file is never loaded whole and both modes report the same summary.
+    """
+    key = cache_key(content_hash, "audio", AUDIO_ANALYZER_ID, PIPELINE_VERSION)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return {"cached": True, **cached}
+
+    analyzer = audio_analyzer()
+    try:
+        for chunk in iter_audio_chunks(path):
+            analyzer.feed(chunk)
+        features = analyzer.finish()["summary"]
+    except Exception as e:
+        features = {"error": "Audio load failed", "detail": str(e)}
+    if "error" not in features:
+        result_cache.put(key, {"audio_features": features})
+    return {"audio_features": features}
+
+
 @router.post("/analyze/audio")
-async def analyze_audio(file: UploadFile):
+@timed_endpoint("analyze_audio")
+async def analyze_audio(file: UploadFile, stream: bool = False):
+    """
+    Analyze an audio file.
+    - stream=false: global features in one JSON response (default)
+    - stream=true: newline-delimited JSON, one line per time segment as soon as it
+      is analyzed, then a summary line; long recordings start answering immediately
+    - 429 with Retry-After when the audio executor is full
+    """
     try:
-        path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(path, "wb") as f:
-            f.write(await file.read())
+        audio_executor.check()  # before the upload is written to disk
+        path, content_hash = await ingest_upload(file, "audio")
+
+        if stream:
+            # The stream holds an audio slot until it ends
+            audio_executor.acquire()
+            return StreamingResponse(
+                _stream_audio_segments(path, file.filename),
+                media_type="application/x-ndjson",
+                background=BackgroundTask(audio_executor.release),
+            )
 
-        features = analyze_audio_features(path)
-        return {"filename": file.filename, "audio_features": features}
+        result = await audio_executor.run(_audio_features, path, content_hash)
+        return {"filename": file.filename, **result}
+    except Overloaded as e:
+        raise _overloaded(e)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio analysis failed: {e}")
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from ..models.schemas import JobRead
+from ..services.jobs import get_job, JOB_DONE, JOB_FAILED
+from ..services.progress import read_events, TERMINAL_EVENTS
+from ..utils.config import settings
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+EVENT_POLL_SEC = 0.25  # how often the event log is checked for new lines
+STATUS_POLL_SEC = 2.0  # how often the job row is re-read while the log is quiet
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def read_job(job_id: str):
+    """
+    Returns the status of a queued video analysis job.
+    - status: queued / running / done / failed
+    - scan_id: the ScanResult id once the job is done
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _sse(event: str, data: dict, event_id=None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, default=str)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _status_payload(job) -> dict:
+    return {"status": job.status, "scan_id": job.scan_id, "error": job.error, "attempts": job.attempts}
+
+
+async def _job_event_stream(job_id: str, offset: int):
+    # File and database reads go to the threadpool; this generator runs on the event loop
+    job = await run_in_threadpool(get_job, job_id)
+    yield _sse("status", _status_payload(job))
+
+    last_status_check = last_sent = time.monotonic()
+    while True:
+        events, offset = await run_in_threadpool(read_events, job_id, offset)
+        for end, event in events:
+            yield _sse(event.get("event", "message"), event, event_id=end)
+            if event.get("event") in TERMINAL_EVENTS:
+                return
+        now = time.monotonic()
+        if events:
+            last_sent = now
+
+        # Jobs that ended without a terminal event in the log (e.g. failed during recovery)
+        if now - last_status_check >= STATUS_POLL_SEC:
+            last_status_check = now
+            job = await run_in_threadpool(get_job, job_id)
+            if job is None or job.status in (JOB_DONE, JOB_FAILED):
+                events, offset = await run_in_threadpool(read_events, job_id, offset)
+                for end, event in events:
+                    yield _sse(event.get("event", "message"), event, event_id=end)
+                    if event.get("event") in TERMINAL_EVENTS:
+                        return
+                yield _sse("done" if job and job.status == JOB_DONE else "failed",
+                           _status_payload(job) if job else {"status": "missing"})
+                return
+
+        if now - last_sent >= settings.SSE_HEARTBEAT_SEC:
+            last_sent = now
+            yield ": keepalive\n\n"  # comment line, keeps proxies from closing an idle stream
+
+        await asyncio.sleep(EVENT_POLL_SEC)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events stream of a video job's progress.
+
+    Events: status (on connect), started, frame (one per scored frame),
+    progress (running overall_score), stage (timings), result, and finally
+    done or failed. Reconnecting clients send Last-Event-ID and resume
+    where they left off.
+    """
+    job = await run_in_threadpool(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    offset = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _job_event_stream(job_id, offset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,97 @@
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from ..models.db import ScanResult, get_db
+from ..services.series import series_lengths, read_columns, frame_records, segment_records
+
+router = APIRouter(prefix="/scans", tags=["scans"])
+
+MAX_PAGE = 5000
+
+
+def _get_scan(db: Session, scan_id: int) -> ScanResult:
+    scan = db.query(ScanResult).filter(ScanResult.id == scan_id).first()
+    if scan is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return scan
+
+
+@router.get("/{scan_id}")
+def read_scan(scan_id: int, db: Session = Depends(get_db)):
+    """
+    One scan with its summary report. Per-frame scores, face boxes and audio
+    segments are not included; page through them with /frames and /audio.
+    """
+    scan = _get_scan(db, scan_id)
+    return {
+        "id": scan.id,
+        "filename": scan.filename,
+        "user": scan.user,
+        "created_at": scan.created_at.isoformat(),
+        "authenticity_score": scan.authenticity_score,
+        "is_fake": scan.is_fake,
+        "report": scan.report,
+        "series": series_lengths(db, scan_id),
+    }
+
+
+@router.get("/{scan_id}/frames")
+def read_frame_range(
+    scan_id: int,
+    start: int = Query(0, ge=0),
+    count: int = Query(500, ge=1, le=MAX_PAGE),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-frame results [start, start + count) in time order: score, method,
+    face flag, audio score and face boxes. Only that slice is read.
+    """
+    lengths = series_lengths(db, scan_id)
+    if "frames" not in lengths:
+        # Scans stored before per-frame data moved out of the report
+        scan = _get_scan(db, scan_id)
+        scores = (scan.report or {}).get("frame_scores") or []
+        return {
+            "scan_id": scan_id,
+            "total": len(scores),
+            "start": start,
+            "frames": [{"fake_prob": s} for s in scores[start:start + count]],
+        }
+
+    columns = read_columns(db, scan_id, "frames", start, count)
+
+    faces = None
+    if "faces" in lengths:
+        face_frames = read_columns(db, scan_id, "faces", 0, None).get("frame")
+        lo, hi = np.searchsorted(face_frames, [start, start + count])
+        if hi > lo:
+            faces = read_columns(db, scan_id, "faces", int(lo), int(hi - lo))
+
+    return {
+        "scan_id": scan_id,
+        "total": lengths["frames"],
+        "start": start,
+        "frames": frame_records(columns, start, faces),
+    }
+
+
+@router.get("/{scan_id}/audio")
+def read_audio_range(
+    scan_id: int,
+    start: int = Query(0, ge=0),
+    count: int = Query(500, ge=1, le=MAX_PAGE),
+    db: Session = Depends(get_db),
+):
+    """Audio segments [start, start + count): start/end seconds, energy, zcr, fake_score."""
+    lengths = series_lengths(db, scan_id)
+    if "segments" not in lengths:
+        scan = _get_scan(db, scan_id)
+        timeline = (scan.report or {}).get("audio_timeline") or []
+        return {"scan_id": scan_id, "total": len(timeline), "start": start, "segments": timeline[start:start + count]}
+
+    return {
+        "scan_id": scan_id,
+        "total": lengths["segments"],
+        "start": start,
+        "segments": segment_records(read_columns(db, scan_id, "segments", start, count)),
+    }
@@ -0,0 +1,116 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.metrics import registry as metrics_registry
+from app.utils.config import settings
+
+REQUESTS_REJECTED = metrics_registry.counter(
+    "deepfake_requests_rejected_total", "Requests turned away because an analysis executor was full", ("executor",)
+)
+
+
+class Overloaded(RuntimeError):
+    """No capacity left; status_code and retry_after are what the client is answered with."""
+
+    def __init__(self, detail: str, retry_after: int, status_code: int = 429):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class AdmissionExecutor:
+    """
+    Bounded thread pool for the CPU-bound part of an endpoint, with admission control.
+
+    At most `workers` calls run at once and `queue_size` more may wait; a
+    request beyond that is refused immediately (Overloaded) instead of
+    queueing without limit, so the event loop stays free and the wait of an
+    admitted request stays bounded. Retry-After is estimated from the recent
+    service time and the current backlog.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._avg_seconds = None  # EWMA of service time
+
+    # ------------------------------
+    # SLOTS
+    # ------------------------------
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def acquire(self):
+        """Take a slot or raise Overloaded (429)."""
+        if not self.try_acquire():
+            REQUESTS_REJECTED.inc(executor=self.name)
+            raise Overloaded(f"Server busy ({self.name} queue full), retry later", self.retry_after())
+
+    def check(self):
+        """Cheap early rejection before reading an upload; run() takes the slot."""
+        if self._in_flight >= self.capacity:
+            REQUESTS_REJECTED.inc(executor=self.name)
+            raise Overloaded(f"Server busy ({self.name} queue full), retry later", self.retry_after())
+
+    def retry_after(self) -> int:
+        avg = self._avg_seconds or 1.0
+        backlog = max(1, self._in_flight - self.workers + 1)
+        return max(1, math.ceil(avg * backlog / self.workers))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # ------------------------------
+    # EXECUTION
+    # ------------------------------
+    def _timed(self, fn, args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self._avg_seconds = seconds if self._avg_seconds is None else 0.8 * self._avg_seconds + 0.2 * seconds
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool and await it. Raises Overloaded when full."""
+        self.acquire()
+        try:
+            fut = self._pool.submit(self._timed, fn, args)
+        except Exception:
+            self.release()
+            raise
+        # Released when the work ends, even if the client went away meanwhile
+        fut.add_done_callback(lambda _: self.release())
+        return await asyncio.wrap_future(fut)
+
+
+# Image requests mostly wait on the shared micro-batcher, so enough workers to fill a batch
+image_executor = AdmissionExecutor(
+    "image", workers=settings.IMAGE_WORKERS, queue_size=settings.IMAGE_QUEUE_SIZE
+)
+# librosa feature extraction is CPU bound, keep it to a few threads
+audio_executor = AdmissionExecutor(
+    "audio", workers=settings.AUDIO_WORKERS, queue_size=settings.AUDIO_QUEUE_SIZE
+)
@@ -0,0 +1,123 @@
+import hashlib
+import io
+import tarfile
+import zipfile
+
+from PIL import Image
+
+from app.services.storage import sniff_media_type
+from app.utils.config import settings
+
+# -------------------------------------------------------
+# BATCH IMAGE INGESTION (in memory, no upload files written)
+# -------------------------------------------------------
+class BatchItem:
+    """One image of a batch upload: raw bytes, or the reason it was refused."""
+
+    __slots__ = ("index", "filename", "data", "error")
+
+    def __init__(self, index: int, filename: str, data: bytes = None, error: str = None):
+        self.index = index
+        self.filename = filename
+        self.data = data
+        self.error = error
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+
+class BatchLimitExceeded(RuntimeError):
+    """The batch went over MAX_BATCH_IMAGES or MAX_BATCH_SIZE_MB; the rest is not read."""
+
+
+def sniff_archive(head: bytes):
+    """'zip', 'tar' (plain or gzip/bz2/xz compressed) or None."""
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        return "zip"
+    if head.startswith((b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")):
+        return "tar"
+    if len(head) >= 262 and head[257:262] == b"ustar":
+        return "tar"
+    return None
+
+
+def _iter_zip(fileobj):
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with archive.open(info) as member:
+                yield info.filename, info.file_size, member
+
+
+def _iter_tar(fileobj):
+    with tarfile.open(fileobj=fileobj, mode="r:*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            yield info.name, info.size, archive.extractfile(info)
+
+
+class BatchReader:
+    """
+    Expands a batch upload into BatchItems: plain image parts are used as is,
+    zip/tar archives are read member by member straight from the spooled
+    upload. Limits are enforced while reading, so an archive that expands past
+    MAX_BATCH_SIZE_MB is never fully decompressed.
+    """
+
+    def __init__(self, max_images: int = None, max_total_mb: float = None, max_image_mb: float = None):
+        self.max_images = max_images or settings.MAX_BATCH_IMAGES
+        self.max_total = int((max_total_mb or settings.MAX_BATCH_SIZE_MB) * 1024 * 1024)
+        self.max_image = int((max_image_mb or settings.MAX_IMAGE_SIZE_MB) * 1024 * 1024)
+        self.count = 0
+        self.total_bytes = 0
+
+    def _item(self, filename: str, declared_size: int, stream) -> BatchItem:
+        if self.count >= self.max_images:
+            raise BatchLimitExceeded(f"Batch limit of {self.max_images} images reached")
+        index = self.count
+        self.count += 1
+
+        if declared_size is not None and declared_size > self.max_image:
+            return BatchItem(index, filename, error=f"Image too large, limit is {self.max_image // (1024 * 1024)} MB")
+
+        data = stream.read(self.max_image + 1)  # one byte past the limit detects oversized files
+        if len(data) > self.max_image:
+            return BatchItem(index, filename, error=f"Image too large, limit is {self.max_image // (1024 * 1024)} MB")
+        self.total_bytes += len(data)
+        if self.total_bytes > self.max_total:
+            raise BatchLimitExceeded(f"Batch larger than {self.max_total // (1024 * 1024)} MB")
+
+        if not data:
+            return BatchItem(index, filename, error="Empty file")
+        if sniff_media_type(data[:64]) != "image":
+            return BatchItem(index, filename, error="Unsupported file type, expected image")
+        return BatchItem(index, filename, data=data)
+
+    def items(self, uploads):
+        """Yield BatchItems from a list of UploadFiles, in upload (and archive) order."""
+        for upload in uploads:
+            fileobj = upload.file
+            fileobj.seek(0)
+            kind = sniff_archive(fileobj.read(512))
+            fileobj.seek(0)
+
+            if kind is None:
+                yield self._item(upload.filename, None, fileobj)
+                continue
+
+            members = _iter_zip(fileobj) if kind == "zip" else _iter_tar(fileobj)
+            try:
+                for name, size, member in members:
+                    yield self._item(f"{upload.filename}/{name}", size, member)
+            except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+                yield BatchItem(self.count, upload.filename, error=f"Unreadable archive: {e}")
+                self.count += 1
+
+
+def decode_image(data: bytes) -> Image.Image:
+    """Decode image bytes to RGB without touching the disk."""
+    with Image.open(io.BytesIO(data)) as img:
+        return img.convert("RGB")
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from uuid import uuid4
+
+from app.utils.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def cache_key(content_hash: str, kind: str, model_id: str, pipeline_version: str) -> str:
+    """
+    Content-addressed key: the same bytes analyzed by the same model and
+    pipeline version always map to the same entry.
+    """
+    raw = f"{kind}|{content_hash}|{model_id}|{pipeline_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk JSON cache of finished analysis results.
+
+    - Entries expire after `ttl_sec`
+    - About `max_entries` files are kept; least recently used are evicted
+      (a hit touches the file, so mtime doubles as the LRU clock)
+    - Writes only count new entries; the directory is swept once the count
+      passes max_entries + 10% and trimmed back to max_entries, so a put is
+      amortized O(1) instead of a directory scan each time
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 1000, ttl_sec: int = 7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, max_entries)
+        self.high_water = self.max_entries + max(1, self.max_entries // 10)
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._count = None  # entries on disk as of the last sweep plus new ones since (None = not swept yet)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            if self.ttl_sec and time.time() - os.path.getmtime(path) > self.ttl_sec:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path, None)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not read entry: %s", e)
+            return None
+
+    def put(self, key: str, value) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid4().hex}.tmp"
+        try:
+            is_new = not os.path.exists(path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+            if is_new:
+                self._added()
+        except Exception as e:
+            logger.warning("Could not write entry: %s", e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _added(self) -> None:
+        with self._lock:
+            if self._count is not None:
+                self._count += 1
+                if self._count <= self.high_water:
+                    return
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries and trim to max_entries; the caller holds the lock."""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            mtime = entry.stat().st_mtime
+            if self.ttl_sec and now - mtime > self.ttl_sec:
+                os.remove(entry.path)
+                continue
+            entries.append((mtime, entry.path))
+
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            entries.sort()
+            for _, path in entries[:overflow]:
+                os.remove(path)
+        self._count = min(len(entries), self.max_entries)
+
+
+result_cache = ResultCache(
+    cache_dir=settings.RESULT_CACHE_DIR,
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl_sec=settings.RESULT_CACHE_TTL_SEC,
+)
@@ -0,0 +1,382 @@
+import datetime
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from uuid import uuid4
+
+from app.models.db import SessionLocal, AnalysisJob
+from app.services.metrics import registry as metrics_registry, JOB_QUEUE_WAIT_SECONDS, JOBS_FINISHED
+from app.services.progress import JobProgress
+from app.utils.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -------------------------------------------------------
+# ENQUEUE
+# -------------------------------------------------------
+def enqueue_video_job(video_path: str, filename: str, content_hash: str = None, options: dict = None) -> str:
+    """Persist a queued job and wake the dispatcher. Returns the job id."""
+    db = SessionLocal()
+    try:
+        job = AnalysisJob(
+            id=uuid4().hex,
+            filename=filename,
+            video_path=video_path,
+            content_hash=content_hash,
+            options=options,
+            status=JOB_QUEUED,
+        )
+        db.add(job)
+        db.commit()
+        job_id = job.id
+    finally:
+        db.close()
+
+    job_runner.wake()
+    return job_id
+
+
+def get_job(job_id: str):
+    db = SessionLocal()
+    try:
+        return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    finally:
+        db.close()
+
+
+# -------------------------------------------------------
+# WORKER ENTRY (runs inside the pool)
+# -------------------------------------------------------
+def _execute_job(job_id: str, video_path: str, filename: str, content_hash: str, options: dict):
+    # Imported here so worker processes only load the ML stack when they run a job
+    from app.routes.analyze import run_full_pipeline
+
+    # In a worker process, metrics recorded during the job go back with the result
+    # for the web process to merge; in thread mode they are already in its registry
+    before = metrics_registry.snapshot() if multiprocessing.parent_process() is not None else None
+
+    # No session here: the pipeline opens one only for its final write
+    scan_id = run_full_pipeline(
+        video_path, None, filename, content_hash, options, progress=JobProgress(job_id)
+    )
+    return scan_id, metrics_registry.delta(before) if before is not None else None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# -------------------------------------------------------
+# DISPATCHER
+# -------------------------------------------------------
+class JobRunner:
+    """
+    Polls the analysis_jobs table and runs queued jobs on a bounded pool.
+
+    - At most `workers` jobs run at once per web process
+    - Jobs are claimed with a conditional UPDATE, so several uvicorn
+      workers can share one queue without running a job twice
+    - Running jobs hold a lease (heartbeat_at, refreshed by the dispatcher);
+      jobs left 'running' by a dead process on this host, or whose lease
+      expired on any host, are re-queued (or failed once they exceed
+      JOB_MAX_ATTEMPTS)
+    """
+
+    def __init__(self, workers: int, executor: str = "process", poll_interval: float = 1.0):
+        self.workers = max(1, workers)
+        self.executor_kind = executor
+        self.poll_interval = poll_interval
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._last_heartbeat = 0.0
+
+    def _make_pool(self):
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        # spawn: the web process has live threads (batcher, HTTP pool), forking them is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.recover()
+        self._stop.clear()
+        self._pool = self._make_pool()
+        self._thread = threading.Thread(target=self._loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("Dispatcher started with %d %s workers", self.workers, self.executor_kind)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self):
+        self._wake.set()
+
+    def recover(self, startup: bool = True):
+        """
+        Re-queue running jobs whose owner is gone: a dead process on this host,
+        this very process at startup (a restarted container can reuse the pid),
+        or any dispatcher whose lease ran out (JOB_LEASE_SEC without a heartbeat).
+        """
+        host = OWNER_ID.split(":")[0]
+        expired_before = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.JOB_LEASE_SEC)
+        db = SessionLocal()
+        try:
+            recovered = []
+            for job in db.query(AnalysisJob).filter(AnalysisJob.status == JOB_RUNNING).all():
+                job_id, owner, attempts = job.id, job.owner, job.attempts or 0  # rows expire on commit
+                if owner == OWNER_ID:
+                    # Nothing runs before start(), so at startup these are leftovers
+                    if not startup:
+                        continue
+                else:
+                    owner_host, _, owner_pid = (owner or "").rpartition(":")
+                    owner_dead = owner_host == host and not (owner_pid.isdigit() and _pid_alive(int(owner_pid)))
+                    last_seen = job.heartbeat_at or job.started_at
+                    lease_expired = last_seen is None or last_seen < expired_before
+                    if not (owner_dead or lease_expired):
+                        continue
+
+                if attempts >= settings.JOB_MAX_ATTEMPTS:
+                    changes = {
+                        AnalysisJob.status: JOB_FAILED,
+                        AnalysisJob.error: "Interrupted too many times",
+                        AnalysisJob.finished_at: datetime.datetime.utcnow(),
+                    }
+                else:
+                    changes = {AnalysisJob.status: JOB_QUEUED, AnalysisJob.owner: None, AnalysisJob.heartbeat_at: None}
+                # Conditional, like _claim_next: another dispatcher may be recovering the same row
+                updated = (
+                    db.query(AnalysisJob)
+                    .filter(
+                        AnalysisJob.id == job_id,
+                        AnalysisJob.status == JOB_RUNNING,
+                        AnalysisJob.owner == owner,
+                    )
+                    .update(changes, synchronize_session=False)
+                )
+                db.commit()
+                if updated:
+                    recovered.append((job_id, changes[AnalysisJob.status], attempts))
+                    logger.warning(
+                        "Recovered interrupted job %s (owner %s) → %s", job_id, owner, changes[AnalysisJob.status]
+                    )
+        finally:
+            db.close()
+
+        for job_id, status, attempts in recovered:
+            if status == JOB_QUEUED:
+                JobProgress(job_id).emit("requeued", status=status, attempts=attempts)
+            else:
+                JobProgress(job_id).emit("failed", status=status, error="Interrupted too many times")
+        if recovered:
+            self._wake.set()
+
+    def _heartbeat(self):
+        """Renew the lease of every job this process is running, and reclaim expired ones."""
+        now = time.monotonic()
+        if now - self._last_heartbeat < settings.JOB_LEASE_SEC / 4:
+            return
+        self._last_heartbeat = now
+        db = SessionLocal()
+        try:
+            db.query(AnalysisJob).filter(
+                AnalysisJob.status == JOB_RUNNING, AnalysisJob.owner == OWNER_ID
+            ).update({AnalysisJob.heartbeat_at: datetime.datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self.recover(startup=False)
+
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running. Returns it or None."""
+        db = SessionLocal()
+        try:
+            candidates = (
+                db.query(AnalysisJob.id)
+                .filter(AnalysisJob.status == JOB_QUEUED)
+                .order_by(AnalysisJob.created_at)
+                .limit(5)
+                .all()
+            )
+            for (job_id,) in candidates:
+                claimed = (
+                    db.query(AnalysisJob)
+                    .filter(AnalysisJob.id == job_id, AnalysisJob.status == JOB_QUEUED)
+                    .update(
+                        {
+                            AnalysisJob.status: JOB_RUNNING,
+                            AnalysisJob.owner: OWNER_ID,
+                            AnalysisJob.started_at: datetime.datetime.utcnow(),
+                            AnalysisJob.heartbeat_at: datetime.datetime.utcnow(),
+                            AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            return None
+        finally:
+            db.close()
+
+    def _finish(self, job_id: str, status: str, scan_id=None, error=None):
+        db = SessionLocal()
+        try:
+            db.query(AnalysisJob).filter(AnalysisJob.id == job_id).update(
+                {
+                    AnalysisJob.status: status,
+                    AnalysisJob.scan_id: scan_id,
+                    AnalysisJob.error: error,
+                    AnalysisJob.finished_at: datetime.datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+        JOBS_FINISHED.inc(status=status)
+
+        # Terminal event goes out after the row is updated, so clients can fetch it straight away
+        if status == JOB_DONE:
+            JobProgress(job_id).emit("done", status=status, scan_id=scan_id)
+        else:
+            JobProgress(job_id).emit("failed", status=status, error=error)
+
+    def _replace_pool(self, broken):
+        """Swap in a fresh pool once per breakage: every future of the broken pool lands here."""
+        with self._pool_lock:
+            if self._pool is not broken or self._stop.is_set():
+                return
+            self._pool = self._make_pool()
+        broken.shutdown(wait=False)
+        logger.warning("Replaced broken worker pool")
+
+    def _retry(self, job_id: str, error: str):
+        """Re-queue a job lost with its worker, or fail it once it used up JOB_MAX_ATTEMPTS."""
+        db = SessionLocal()
+        try:
+            requeued = (
+                db.query(AnalysisJob)
+                .filter(AnalysisJob.id == job_id, AnalysisJob.attempts < settings.JOB_MAX_ATTEMPTS)
+                .update(
+                    {
+                        AnalysisJob.status: JOB_QUEUED,
+                        AnalysisJob.owner: None,
+                        AnalysisJob.heartbeat_at: None,
+                        AnalysisJob.error: error,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        if not requeued:
+            self._finish(job_id, JOB_FAILED, error=error)
+            return
+        logger.warning("Job %s re-queued: %s", job_id, error)
+        JobProgress(job_id).emit("requeued", status=JOB_QUEUED, error=error)
+
+    def _on_done(self, job_id: str, fut, pool):
+        try:
+            scan_id, metrics_delta = fut.result()
+            metrics_registry.merge(metrics_delta)
+            if scan_id is None:
+                self._finish(job_id, JOB_FAILED, error="No frames could be extracted")
+            else:
+                self._finish(job_id, JOB_DONE, scan_id=scan_id)
+            logger.info("Job %s finished", job_id)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM); every job on the pool fails with it, not only the culprit
+            logger.error("Worker pool broke while running %s: %s", job_id, e)
+            self._replace_pool(pool)
+            self._retry(job_id, f"Worker crashed: {e}")
+        except Exception as e:
+            logger.error("Job %s failed: %s", job_id, e)
+            self._finish(job_id, JOB_FAILED, error=str(e))
+        finally:
+            self._slots.release()
+            self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self._heartbeat()
+            except Exception as e:
+                logger.error("Could not renew job leases: %s", e)
+
+            if not self._slots.acquire(timeout=self.poll_interval):
+                continue
+
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                logger.error("Could not claim job: %s", e)
+                job = None
+
+            if job is None:
+                self._slots.release()
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            if job.created_at and job.started_at:
+                JOB_QUEUE_WAIT_SECONDS.observe(max(0.0, (job.started_at - job.created_at).total_seconds()))
+
+            pool = self._pool
+            try:
+                fut = pool.submit(
+                    _execute_job, job.id, job.video_path, job.filename, job.content_hash, job.options
+                )
+            except BrokenProcessPool as e:
+                self._slots.release()
+                self._replace_pool(pool)
+                self._retry(job.id, f"Worker crashed: {e}")
+                continue
+            except Exception as e:
+                self._slots.release()
+                self._finish(job.id, JOB_FAILED, error=f"Could not start job: {e}")
+                continue
+            fut.add_done_callback(lambda f, job_id=job.id, pool=pool: self._on_done(job_id, f, pool))
+
+
+job_runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    executor=settings.JOB_EXECUTOR,
+    poll_interval=settings.JOB_POLL_INTERVAL_SEC,
+)
@@ -0,0 +1,262 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# -------------------------------------------------------
+# IN-PROCESS METRICS (Prometheus text exposition format)
+# -------------------------------------------------------
+# Counters and histograms are plain dicts behind one lock per metric, so
+# recording on the hot path is a dict update. Video jobs may run in worker
+# processes: the worker returns a snapshot delta with its result and the web
+# process merges it (see app/services/jobs.py), so GET /metrics covers them.
+
+# Latency buckets in seconds, from a single frame up to a long video job
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _labels_key(labelnames, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(labelnames, key)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels_key(self.labelnames, labels), 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+    @staticmethod
+    def delta(after, before):
+        return after - before
+
+    def render(self) -> list:
+        lines = []
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels → [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels_key(self.labelnames, labels)
+        pos = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            state[pos] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_labels_key(self.labelnames, labels))
+        return sum(state[:-1]) if state else 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: list(state) for key, state in self._values.items()}
+
+    def merge(self, values: dict):
+        with self._lock:
+            for key, incoming in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    self._values[key] = list(incoming)
+                else:
+                    for i, v in enumerate(incoming):
+                        state[i] += v
+
+    @staticmethod
+    def delta(after, before):
+        return [a - b for a, b in zip(after, before)]
+
+    def render(self) -> list:
+        lines = []
+        for key, state in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(state[-1], 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=SECONDS_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+    def delta(self, before: dict) -> dict:
+        """What was recorded since `before` (a snapshot()); picklable, for merge() in another process."""
+        changes = {}
+        for name, values in self.snapshot().items():
+            metric, old = self._metrics[name], before.get(name, {})
+            diff = {}
+            for key, value in values.items():
+                d = metric.delta(value, old[key]) if key in old else value
+                if any(d) if isinstance(d, list) else d:
+                    diff[key] = d
+            if diff:
+                changes[name] = diff
+        return changes
+
+    def merge(self, changes: dict):
+        for name, values in (changes or {}).items():
+            if name in self._metrics:
+                self._metrics[name].merge(values)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# -------------------------------------------------------
+# METRICS
+# -------------------------------------------------------
+STAGE_SECONDS = registry.histogram(
+    "deepfake_pipeline_stage_seconds", "Duration of each video pipeline stage", ("stage",)
+)
+REQUEST_SECONDS = registry.histogram(
+    "deepfake_request_seconds", "Analysis endpoint latency", ("endpoint", "status")
+)
+HF_API_REQUESTS = registry.counter(
+    "deepfake_hf_api_requests_total", "HF Inference API frame scoring attempts", ("result",)
+)
+HEURISTIC_FALLBACKS = registry.counter(
+    "deepfake_heuristic_fallbacks_total", "Frames scored by heuristic_predict because the HF API gave no score"
+)
+JOB_FRAMES = registry.histogram(
+    "deepfake_job_frames", "Frames analyzed per video job", buckets=COUNT_BUCKETS
+)
+JOB_QUEUE_WAIT_SECONDS = registry.histogram(
+    "deepfake_job_queue_wait_seconds", "Time a video job waited in the queue before a worker claimed it"
+)
+JOBS_FINISHED = registry.counter(
+    "deepfake_jobs_finished_total", "Video jobs that reached a terminal state", ("status",)
+)
+
+
+class StageTimer:
+    """
+    Times named stages of one pipeline run: each stage is observed in
+    STAGE_SECONDS and accumulated in .seconds for the job's report.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage=name)
+
+    def report(self) -> dict:
+        return {name: round(s, 4) for name, s in self.seconds.items()}
+
+
+def timed_endpoint(name: str):
+    """Decorator for async route handlers: observes latency in REQUEST_SECONDS by status code."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = "500"
+            try:
+                result = await fn(*args, **kwargs)
+                status = str(getattr(result, "status_code", 200))
+                return result
+            except Exception as e:
+                status = str(getattr(e, "status_code", 500))
+                raise
+            finally:
+                REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=name, status=status)
+
+        return wrapper
+
+    return decorator
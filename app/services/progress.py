@@ -0,0 +1,68 @@
+import json
+import os
+import time
+
+from app.utils.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Event types a job log can end with
+TERMINAL_EVENTS = ("done", "failed")
+
+
+def events_path(job_id: str) -> str:
+    return os.path.join(settings.JOB_EVENTS_DIR, f"{os.path.basename(job_id)}.ndjson")
+
+
+class JobProgress:
+    """
+    Append-only NDJSON event log for one analysis job.
+
+    Jobs may run in a worker process, so events go through a file instead of
+    memory: the pipeline appends, and any web worker can tail the file for a
+    client (see read_events). Each event is written with a single O_APPEND
+    write, so readers never see interleaved halves of two lines.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.path = events_path(job_id)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def emit(self, event: str, **data) -> None:
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **data}, default=str) + "\n"
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except Exception as e:
+            # Progress is best effort, it must never fail the analysis
+            logger.warning("Could not write event for %s: %s", self.job_id, e)
+
+
+def read_events(job_id: str, offset: int = 0):
+    """
+    Complete events appended after byte `offset`.
+    Returns (list of (end offset, event dict), new offset); a trailing
+    partial line is left for the next read.
+    """
+    try:
+        with open(events_path(job_id), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    events = []
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        try:
+            events.append((offset, json.loads(line)))
+        except ValueError:
+            continue
+    return events, offset
@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+from sqlalchemy import func
+
+from app.ml_core.frames import frame_name, frame_index
+from app.models.db import ScanSeries
+
+# -------------------------------------------------------
+# PACKED LAYOUT
+# -------------------------------------------------------
+# Each group is a table of equal-length numeric columns, stored one
+# ScanSeries row per column ("<group>.<column>"). float32 is plenty for
+# probabilities and timestamps; missing values are NaN / -1.
+FRAME_COLUMNS = (
+    ("index", "<i4"),        # frame_name() index
+    ("time", "<f4"),
+    ("fake_prob", "<f4"),
+    ("audio_score", "<f4"),
+    ("has_face", "<i1"),     # 1 / 0, -1 unknown
+    ("method", "<u1"),       # code in METHODS
+    ("source", "<i4"),       # index of the frame a near-duplicate reused, -1 none
+)
+SEGMENT_COLUMNS = (
+    ("start", "<f4"),
+    ("end", "<f4"),
+    ("energy", "<f4"),
+    ("zcr", "<f4"),
+    ("fake_score", "<f4"),
+)
+FACE_COLUMNS = (
+    ("frame", "<i4"),        # row in the frames group
+    ("x", "<i4"),
+    ("y", "<i4"),
+    ("w", "<i4"),
+    ("h", "<i4"),
+    ("fake_prob", "<f4"),
+)
+
+METHODS = ("hf_local", "hf_api", "heuristic", "no_face", "failed")  # append only, codes are stored
+NO_METHOD = 255
+
+
+def _num(value):
+    return np.nan if value is None else value
+
+
+def _pack(scan_id: int, group: str, columns, rows: list) -> list:
+    """rows: tuples in column order → scan_series row dicts."""
+    series = []
+    for pos, (name, dtype) in enumerate(columns):
+        arr = np.asarray([row[pos] for row in rows], dtype=dtype)
+        series.append({
+            "scan_id": scan_id,
+            "name": f"{group}.{name}",
+            "dtype": dtype,
+            "itemsize": arr.dtype.itemsize,
+            "length": len(arr),
+            "data": arr.tobytes(),
+        })
+    return series
+
+
+def scan_series_rows(scan_id: int, frame_results: list, audio_timeline: list) -> list:
+    """
+    Pack per-frame results (time order), face boxes and audio segments into
+    scan_series rows, ready for one executemany insert.
+    """
+    frame_rows, face_rows = [], []
+    for pos, r in enumerate(frame_results):
+        frame_rows.append((
+            frame_index(r["frame"]),
+            r["time"],
+            _num(r.get("fake_prob")),
+            _num(r.get("audio_score")),
+            -1 if r.get("has_face") is None else int(bool(r["has_face"])),
+            METHODS.index(r["method"]) if r.get("method") in METHODS else NO_METHOD,
+            frame_index(r["deduped_from"]) if r.get("deduped_from") else -1,
+        ))
+        for face in r.get("faces") or []:
+            x, y, w, h = face["box"]
+            face_rows.append((pos, x, y, w, h, _num(face.get("fake_prob"))))
+
+    segment_rows = [
+        (seg["start"], seg["end"], seg["energy"], seg["zcr"], seg["fake_score"])
+        for seg in audio_timeline or []
+    ]
+
+    series = _pack(scan_id, "frames", FRAME_COLUMNS, frame_rows)
+    if face_rows:
+        series += _pack(scan_id, "faces", FACE_COLUMNS, face_rows)
+    if segment_rows:
+        series += _pack(scan_id, "segments", SEGMENT_COLUMNS, segment_rows)
+    return series
+
+
+# -------------------------------------------------------
+# RANGE READS
+# -------------------------------------------------------
+def series_lengths(db, scan_id: int) -> dict:
+    """{group: row count} without touching the data blobs."""
+    rows = db.query(ScanSeries.name, ScanSeries.length).filter(ScanSeries.scan_id == scan_id).all()
+    return {name.split(".", 1)[0]: length for name, length in rows}
+
+
+def read_columns(db, scan_id: int, group: str, start: int = 0, count: int = None) -> dict:
+    """
+    Rows [start, start + count) of a group as {column: ndarray}.
+    Only the requested byte range of each blob is read from the database.
+    """
+    length_expr = (count if count is not None else ScanSeries.length) * ScanSeries.itemsize
+    rows = (
+        db.query(
+            ScanSeries.name,
+            ScanSeries.dtype,
+            func.substr(ScanSeries.data, start * ScanSeries.itemsize + 1, length_expr),
+        )
+        .filter(ScanSeries.scan_id == scan_id, ScanSeries.name.like(f"{group}.%"))
+        .all()
+    )
+    return {name.split(".", 1)[1]: np.frombuffer(data or b"", dtype=dtype) for name, dtype, data in rows}
+
+
+def _val(x):
+    if isinstance(x, (float, np.floating)):
+        # str() of a float32 is its shortest round-trip form (0.7, not 0.699999988)
+        return None if math.isnan(x) else float(str(x))
+    return int(x)
+
+
+def frame_records(columns: dict, start: int = 0, faces: dict = None) -> list:
+    """Frame dicts in the same shape as the pipeline's frame results."""
+    n = len(columns.get("index", ()))
+    records = []
+    for i in range(n):
+        method = int(columns["method"][i])
+        has_face = int(columns["has_face"][i])
+        source = int(columns["source"][i])
+        record = {
+            "frame": frame_name(int(columns["index"][i])),
+            "time": _val(columns["time"][i]),
+            "fake_prob": _val(columns["fake_prob"][i]),
+            "method": METHODS[method] if method < len(METHODS) else None,
+            "has_face": None if has_face < 0 else bool(has_face),
+            "audio_score": _val(columns["audio_score"][i]),
+        }
+        if source >= 0:
+            record["deduped_from"] = frame_name(source)
+        records.append(record)
+
+    if faces:
+        for pos, x, y, w, h, prob in zip(*(faces[c] for c, _ in FACE_COLUMNS)):
+            pos = int(pos) - start
+            if 0 <= pos < n:
+                records[pos].setdefault("faces", []).append(
+                    {"box": [int(x), int(y), int(w), int(h)], "fake_prob": _val(prob)}
+                )
+    return records
+
+
+def segment_records(columns: dict) -> list:
+    names = [c for c, _ in SEGMENT_COLUMNS]
+    return [
+        {c: _val(v) for c, v in zip(names, values)}
+        for values in zip(*(columns[c] for c in names))
+    ] if columns else []
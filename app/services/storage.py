@@ -1,42 +1,179 @@
 import os
+import hashlib
 from app.utils.config import settings
 from uuid import uuid4
 from pathlib import Path
 import aiofiles
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Ensure upload directory exists
 Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class UploadRejected(RuntimeError):
+    """Upload refused during ingestion; status_code is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
 
-async def save_upload_file(field, filename: str = None) -> str:
+
+# -------------------------------------------------------
+# MAGIC-BYTE SNIFFING
+# -------------------------------------------------------
+def sniff_media_type(head: bytes):
+    """
+    Classify a file from its first bytes.
+    Returns "image", "video", "audio" or None if it is not a known media format.
     """
-    Asynchronously saves an uploaded file.
+    if head.startswith(b"\xff\xd8\xff") or head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image"
+    if head[:6] in (b"GIF87a", b"GIF89a") or head.startswith(b"BM"):
+        return "image"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "image"
+    if head.startswith(b"RIFF") and len(head) >= 12:
+        form = head[8:12]
+        if form == b"WEBP":
+            return "image"
+        if form == b"WAVE":
+            return "audio"
+        if form == b"AVI ":
+            return "video"
+    if len(head) >= 12 and head[4:8] == b"ftyp":
+        # ISO base media (mp4/mov/m4a/3gp); M4A/M4B brands are audio-only
+        return "audio" if head[8:11] in (b"M4A", b"M4B") else "video"
+    if head.startswith(b"\x1a\x45\xdf\xa3") or head.startswith(b"FLV"):
+        return "video"  # Matroska/WebM, Flash video
+    if head.startswith(b"\x00\x00\x01\xba") or head.startswith(b"\x00\x00\x01\xb3"):
+        return "video"  # MPEG program/elementary stream
+    if head.startswith(b"ID3") or head[:4] in (b"OggS", b"fLaC"):
+        return "audio"
+    if len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0:
+        return "audio"  # MPEG audio frame sync (mp3/aac without ID3)
+    return None
+
+
+# -------------------------------------------------------
+# STREAMING INGESTION
+# -------------------------------------------------------
+async def save_upload_file(
+    field,
+    filename: str = None,
+    with_hash: bool = False,
+    max_bytes: int = None,
+    accept: tuple = None,
+):
+    """
+    Asynchronously saves an uploaded file in 1MB chunks.
+
+    The file is written to a temporary name and only renamed into place once
+    it is complete, so readers never see a partial upload.
 
     Args:
         field: FastAPI UploadFile object.
         filename (str, optional): Custom name to save the file with.
+        with_hash (bool): Also compute the SHA-256 of the content while writing.
+        max_bytes (int, optional): Reject with 413 as soon as more bytes arrive.
+        accept (tuple, optional): Media kinds allowed by sniff_media_type, else 415.
 
     Returns:
-        str: Full saved file path.
+        str: Full saved file path, or (path, sha256 hex digest) if with_hash.
     """
+    tmp_path = None
     try:
         # Ensure file starts reading from beginning
         await field.seek(0)
 
-        # Extract safe extension
-        ext = Path(field.filename).suffix if hasattr(field, "filename") else ".bin"
-        filename = filename or f"{uuid4().hex}{ext}"
+        # Extract safe extension (the client name is never trusted beyond this)
+        ext = Path(getattr(field, "filename", None) or "").suffix.lower()
+        if not (1 < len(ext) <= 8 and ext[1:].isalnum()):
+            ext = ".bin"
+        filename = os.path.basename(filename or f"{uuid4().hex}{ext}")
 
         out_path = os.path.join(settings.UPLOAD_DIR, filename)
+        tmp_path = f"{out_path}.part-{uuid4().hex}"
+
+        digest = hashlib.sha256()
+        size = 0
 
         # Asynchronous file write
-        async with aiofiles.open(out_path, "wb") as f:
-            while chunk := await field.read(1024 * 1024):  # write in 1MB chunks
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await field.read(CHUNK_SIZE):
+                if size == 0 and accept:
+                    kind = sniff_media_type(chunk[:64])
+                    if kind not in accept:
+                        raise UploadRejected(
+                            415, f"Unsupported file type, expected {' or '.join(accept)}"
+                        )
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected(
+                        413, f"File too large, limit is {max_bytes // (1024 * 1024)} MB"
+                    )
+                digest.update(chunk)
                 await f.write(chunk)
 
-        print(f"[STORAGE] File saved at: {out_path}")
+        if size == 0 and accept:
+            raise UploadRejected(400, "Empty upload")
+
+        os.replace(tmp_path, out_path)
+        tmp_path = None
+
+        logger.debug("File saved at %s", out_path)
+        if with_hash:
+            return out_path, digest.hexdigest()
         return out_path
 
+    except UploadRejected as e:
+        logger.info("Upload rejected: %s", e.detail)
+        raise
+
     except Exception as e:
-        print("[STORAGE ERROR]:", e)
+        logger.exception("Could not save upload: %s", e)
         raise RuntimeError(f"Failed to save upload file: {str(e)}")
+
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+MEDIA_LIMITS_MB = {
+    "video": settings.MAX_VIDEO_SIZE_MB,
+    "image": settings.MAX_IMAGE_SIZE_MB,
+    "audio": settings.MAX_AUDIO_SIZE_MB,
+}
+
+# Media kinds each endpoint accepts (audio analysis can read audio tracks of video containers)
+ACCEPTED_KINDS = {
+    "video": ("video",),
+    "image": ("image",),
+    "audio": ("audio", "video"),
+}
+
+
+async def ingest_upload(field, kind: str):
+    """
+    Shared ingestion path for the analyze endpoints: streamed to disk with the
+    size limit for `kind` enforced while reading, magic bytes checked on the
+    first chunk, and the content hash computed in the same pass.
+
+    The file is stored under a fresh uuid name, so concurrent uploads with the
+    same client filename never overwrite each other; callers keep
+    field.filename as metadata only.
+
+    Returns:
+        (path, sha256 hex digest)
+    """
+    return await save_upload_file(
+        field,
+        None,
+        with_hash=True,
+        max_bytes=MEDIA_LIMITS_MB[kind] * 1024 * 1024,
+        accept=ACCEPTED_KINDS[kind],
+    )
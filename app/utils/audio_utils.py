@@ -30,6 +30,10 @@ def analyze_audio_features(wav_path: str) -> dict:
     mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
     mfcc_mean = mfcc.mean(axis=1).tolist()
 
+    return _build_features(energy, zcr, mfcc_mean)
+
+
+def _build_features(energy: float, zcr: float, mfcc_mean) -> dict:
     # ⚙️ Heuristic fake score (placeholder logic)
     # In real model, you'd pass these features into an ML classifier
     fake_score = round(min(100.0, (energy * 10000 + zcr * 100)), 2)
@@ -37,8 +41,130 @@ def analyze_audio_features(wav_path: str) -> dict:
     return {
         "energy": round(energy, 6),
         "zcr": round(zcr, 6),
-        "mfcc_mean": [round(x, 4) for x in mfcc_mean],
+        "mfcc_mean": [round(float(x), 4) for x in mfcc_mean],
         "fake_score": fake_score,
         "status": "analyzed"
     }
 
+
+def _segment_fake_score(energy, zcr):
+    # Same placeholder heuristic as _build_features, vectorized over segments
+    return np.round(np.minimum(100.0, energy * 10000 + zcr * 100), 2)
+
+
+class StreamingAudioAnalyzer:
+    """
+    Windowed, streaming version of analyze_audio_features.
+
+    Samples are fed chunk by chunk and cut into fixed-length segments that
+    overlap by (segment_seconds - hop_seconds). Segments are analyzed in
+    batches as one 2-D array (a single librosa MFCC call per batch), so only
+    about one segment plus one batch of samples is held at any time.
+
+    feed() returns the segments completed so far, so callers can publish
+    partial results while the stream is still being decoded.
+    """
+
+    def __init__(self, sr: int = 16000, segment_seconds: float = 2.0, hop_seconds: float = 1.0, batch_size: int = 16):
+        self.sr = sr
+        self.segment_len = max(1, int(segment_seconds * sr))
+        self.hop_len = max(1, min(self.segment_len, int(hop_seconds * sr)))
+        self.batch_size = max(1, batch_size)
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0  # absolute sample index of _buffer[0]
+        self._batch = []        # (start sample, segment) waiting to be analyzed
+        self._covered_until = 0  # absolute sample index reached by emitted segments
+
+        self.timeline = []
+        self._n_samples = 0
+        self._sum_sq = 0.0
+        self._zcr_weighted = 0.0
+        self._mfcc_weighted = None
+        self._weight = 0
+
+    def _analyze(self, starts, segments) -> list:
+        Y = np.stack(segments)
+        energy = np.mean(Y ** 2, axis=1)
+        zcr = np.mean(np.diff(np.signbit(Y), axis=1), axis=1)
+        mfcc_mean = librosa.feature.mfcc(y=Y, sr=self.sr, n_mfcc=13).mean(axis=-1)
+        scores = _segment_fake_score(energy, zcr)
+
+        length = Y.shape[1]
+        self._zcr_weighted += float(zcr.sum()) * length
+        weighted = mfcc_mean.sum(axis=0) * length
+        self._mfcc_weighted = weighted if self._mfcc_weighted is None else self._mfcc_weighted + weighted
+        self._weight += length * len(segments)
+
+        out = []
+        for start, e, z, score in zip(starts, energy, zcr, scores):
+            out.append({
+                "start": round(start / self.sr, 3),
+                "end": round((start + length) / self.sr, 3),
+                "energy": round(float(e), 6),
+                "zcr": round(float(z), 6),
+                "fake_score": float(score),
+            })
+        self.timeline.extend(out)
+        return out
+
+    def _flush_batch(self) -> list:
+        if not self._batch:
+            return []
+        starts, segments = zip(*self._batch)
+        self._batch = []
+        return self._analyze(starts, segments)
+
+    def feed(self, chunk) -> list:
+        """Add samples; returns newly completed segment results (possibly empty)."""
+        if chunk is None or len(chunk) == 0:
+            return []
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self._n_samples += len(chunk)
+        self._sum_sq += float(np.dot(chunk, chunk))
+        self._buffer = np.concatenate([self._buffer, chunk])
+
+        done = []
+        while len(self._buffer) >= self.segment_len:
+            self._batch.append((self._buffer_start, self._buffer[:self.segment_len].copy()))
+            self._covered_until = self._buffer_start + self.segment_len
+            self._buffer = self._buffer[self.hop_len:]
+            self._buffer_start += self.hop_len
+            if len(self._batch) >= self.batch_size:
+                done.extend(self._flush_batch())
+        return done
+
+    def finish(self) -> dict:
+        """
+        Analyze what is left and return:
+            summary  – same keys as analyze_audio_features (energy is exact,
+                       zcr/MFCC are length-weighted means over segments)
+            timeline – every segment result in time order
+        """
+        self._flush_batch()
+
+        # Tail not covered by any full segment becomes one shorter segment
+        tail_start = max(self._covered_until, self._buffer_start)
+        tail = self._buffer[tail_start - self._buffer_start:]
+        if self._covered_until == 0:
+            tail_start, tail = self._buffer_start, self._buffer
+        if len(tail) >= 2:
+            self._analyze([tail_start], [tail])
+
+        if self._n_samples == 0 or self._weight == 0:
+            return {"summary": {"error": "Empty audio stream"}, "timeline": []}
+
+        summary = _build_features(
+            self._sum_sq / self._n_samples,
+            self._zcr_weighted / self._weight,
+            self._mfcc_weighted / self._weight,
+        )
+        return {"summary": summary, "timeline": self.timeline}
+
+
+def score_at(timeline: list, t: float):
+    """fake_score of the segment whose center is closest to time t (seconds)."""
+    if not timeline:
+        return None
+    best = min(timeline, key=lambda seg: abs((seg["start"] + seg["end"]) / 2 - t))
+    return best["fake_score"]
@@ -18,6 +18,10 @@ class Settings(BaseSettings):
     # DATABASE
     # ---------------------------------------------------
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE_SEC: int = int(os.getenv("DB_POOL_RECYCLE_SEC", 1800))  # server databases only
+    DB_BUSY_TIMEOUT_SEC: float = float(os.getenv("DB_BUSY_TIMEOUT_SEC", 30))  # SQLite lock wait
 
     # ---------------------------------------------------
     # UPLOADS DIRECTORY
@@ -30,11 +34,97 @@ class Settings(BaseSettings):
     HF_DEEPFAKE_MODEL: str = os.getenv("HF_DEEPFAKE_MODEL", "umarbutler/deepfake-detection")
     HF_TOKEN: str = os.getenv("HF_TOKEN", "hf_XXXXXXXXXXXXXXXXXXXXXXXX")
 
+    # HF Inference API client (pooled, concurrent, circuit breaker)
+    HF_API_URL: str = os.getenv("HF_API_URL", "https://api-inference.huggingface.co/models")
+    HF_API_CONCURRENCY: int = int(os.getenv("HF_API_CONCURRENCY", 4))
+    HF_API_TIMEOUT: float = float(os.getenv("HF_API_TIMEOUT", 30))
+    HF_API_MAX_RETRIES: int = int(os.getenv("HF_API_MAX_RETRIES", 3))
+    HF_BREAKER_THRESHOLD: int = int(os.getenv("HF_BREAKER_THRESHOLD", 5))
+    HF_BREAKER_RESET_SEC: float = float(os.getenv("HF_BREAKER_RESET_SEC", 60))
+
+    # "remote" = HF Inference API with heuristic fallback, "local" = batched local model
+    VIDEO_SCORER: str = os.getenv("VIDEO_SCORER", "remote")
+    HF_BATCH_SIZE: int = int(os.getenv("HF_BATCH_SIZE", 16))
+    HF_BATCH_MAX_WAIT_MS: int = int(os.getenv("HF_BATCH_MAX_WAIT_MS", 20))
+    # Local model loading: "background" (at startup, /health answers meanwhile), "blocking" or "lazy" (first use or /ready probe)
+    MODEL_PRELOAD: str = os.getenv("MODEL_PRELOAD", "background")
+    # CPU inference backend: "torch", "torch_int8", "onnx" or "onnx_int8" (see app/ml_core/backends.py)
+    MODEL_BACKEND: str = os.getenv("MODEL_BACKEND", "torch")
+    MODEL_INTRA_OP_THREADS: int = int(os.getenv("MODEL_INTRA_OP_THREADS", 0))  # 0 = library default
+    MODEL_PARITY_TOL: float = float(os.getenv("MODEL_PARITY_TOL", 0.03))  # max score diff vs torch, 0 skips the check
+    ONNX_CACHE_DIR: str = os.getenv("ONNX_CACHE_DIR", "./model_cache")
+
     # ---------------------------------------------------
     # OPTIONAL PERFORMANCE SETTINGS
     # ---------------------------------------------------
-    MAX_VIDEO_SIZE_MB: int = int(os.getenv("MAX_VIDEO_SIZE_MB", 500))  # optional limit
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    MAX_VIDEO_SIZE_MB: int = int(os.getenv("MAX_VIDEO_SIZE_MB", 500))  # enforced while streaming uploads
+    MAX_IMAGE_SIZE_MB: int = int(os.getenv("MAX_IMAGE_SIZE_MB", 20))
+    MAX_AUDIO_SIZE_MB: int = int(os.getenv("MAX_AUDIO_SIZE_MB", 100))
+    # Executors for /analyze/image and /analyze/audio work: requests beyond workers + queue get 429
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", os.getenv("HF_BATCH_SIZE", 16)))  # enough to fill a micro-batch
+    IMAGE_QUEUE_SIZE: int = int(os.getenv("IMAGE_QUEUE_SIZE", 64))
+    AUDIO_WORKERS: int = int(os.getenv("AUDIO_WORKERS", 2))
+    AUDIO_QUEUE_SIZE: int = int(os.getenv("AUDIO_QUEUE_SIZE", 8))
+    MODEL_LOADING_RETRY_AFTER_SEC: int = int(os.getenv("MODEL_LOADING_RETRY_AFTER_SEC", 5))  # 503 while loading
+    # POST /analyze/images/batch: images per request and total (uncompressed) bytes
+    MAX_BATCH_IMAGES: int = int(os.getenv("MAX_BATCH_IMAGES", 5000))
+    MAX_BATCH_SIZE_MB: int = int(os.getenv("MAX_BATCH_SIZE_MB", 500))
+    RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", "./data/result_cache")  # not under UPLOAD_DIR, which is served
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1000))
+    RESULT_CACHE_TTL_SEC: int = int(os.getenv("RESULT_CACHE_TTL_SEC", 7 * 24 * 3600))
+    # Video job queue (SQLite-backed, see app/services/jobs.py)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+    # "process" isolates the CPU-heavy decode of each job, but frames scored in a worker process
+    # never share micro-batches with /analyze/image and every worker loads its own model copy;
+    # so with local scoring jobs run on threads by default and feed the shared batcher
+    JOB_EXECUTOR: str = os.getenv(
+        "JOB_EXECUTOR", "thread" if os.getenv("VIDEO_SCORER", "remote") == "local" else "process"
+    )  # "process" or "thread"
+    JOB_POLL_INTERVAL_SEC: float = float(os.getenv("JOB_POLL_INTERVAL_SEC", 1.0))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_LEASE_SEC: float = float(os.getenv("JOB_LEASE_SEC", 120))  # running jobs without a heartbeat for this long are reclaimed
+    # Per-job progress event logs, streamed to clients by GET /jobs/{id}/events
+    JOB_EVENTS_DIR: str = os.getenv("JOB_EVENTS_DIR", "./data/jobs")
+    PROGRESS_INTERVAL_SEC: float = float(os.getenv("PROGRESS_INTERVAL_SEC", 0.5))  # batching of frame events
+    SSE_HEARTBEAT_SEC: float = float(os.getenv("SSE_HEARTBEAT_SEC", 15))
+
+    # Default frame sampling policy (overridable per /analyze/video request)
+    FRAME_SAMPLE_FPS: float = float(os.getenv("FRAME_SAMPLE_FPS", 1))
+    MAX_SAMPLE_FPS: float = float(os.getenv("MAX_SAMPLE_FPS", 10))  # higher per-request fps is clamped
+    FRAME_MAX_FRAMES: int = int(os.getenv("FRAME_MAX_FRAMES", 0))  # 0 = no cap
+    FRAME_SAMPLING: str = os.getenv("FRAME_SAMPLING", "interval")  # "interval", "uniform", "scene" or "adaptive"
+    FRAME_SEEK: bool = os.getenv("FRAME_SEEK", "false").lower() in ("1", "true", "yes")
+
+    # "adaptive" sampling: coarse-to-fine frames, stop once the verdict's confidence interval clears 0.5
+    EARLY_EXIT_FIRST_PASS: int = int(os.getenv("EARLY_EXIT_FIRST_PASS", 8))  # frames in the first level
+    EARLY_EXIT_ALPHA: float = float(os.getenv("EARLY_EXIT_ALPHA", 0.05))  # total error rate over all checks
+    EARLY_EXIT_MIN_STD: float = float(os.getenv("EARLY_EXIT_MIN_STD", 0.05))  # floor on the sample std
+    EARLY_EXIT_MAX_SECONDS: float = float(os.getenv("EARLY_EXIT_MAX_SECONDS", 0))  # time budget, 0 = none
+
+    FRAME_QUEUE_SIZE: int = int(os.getenv("FRAME_QUEUE_SIZE", 32))  # decoded frames buffered ahead of scoring
+
+    # Per-frame CPU work (face detection, heuristic scoring) inside one video job
+    FRAME_EXECUTOR: str = os.getenv("FRAME_EXECUTOR", "thread")  # "serial", "thread" or "process"
+    FRAME_WORKERS: int = int(os.getenv("FRAME_WORKERS", os.cpu_count() or 1))
+
+    # Face-crop-first scoring: classify detected face crops instead of whole frames
+    FACE_CROPS: bool = os.getenv("FACE_CROPS", "false").lower() in ("1", "true", "yes")
+    FACE_CROP_SIZE: int = int(os.getenv("FACE_CROP_SIZE", 224))  # model input size
+    FACE_DETECT_MAX_SIDE: int = int(os.getenv("FACE_DETECT_MAX_SIDE", 640))  # detection runs on a downscaled copy
+    NO_FACE_POLICY: str = os.getenv("NO_FACE_POLICY", "full_frame")  # "full_frame" or "skip"
+
+    # Near-duplicate frame dedup (dHash + Hamming distance)
+    FRAME_DEDUP: bool = os.getenv("FRAME_DEDUP", "true").lower() in ("1", "true", "yes")
+    FRAME_DEDUP_THRESHOLD: int = int(os.getenv("FRAME_DEDUP_THRESHOLD", 4))  # max differing bits of 64
+    # Opt-in cross-job LRU of frame scores (0 = off). A 64-bit dHash barely changes under a face
+    # swap, so a manipulated copy of an earlier video can inherit its authentic scores (false negatives)
+    FRAME_DEDUP_GLOBAL_SIZE: int = int(os.getenv("FRAME_DEDUP_GLOBAL_SIZE", 0))
+    # Windowed audio analysis (video jobs hop at the frame sampling interval, floored at AUDIO_HOP_SEC)
+    AUDIO_SEGMENT_SEC: float = float(os.getenv("AUDIO_SEGMENT_SEC", 2.0))
+    AUDIO_HOP_SEC: float = float(os.getenv("AUDIO_HOP_SEC", 1.0))
+    SAVE_AUDIO_WAV: bool = os.getenv("SAVE_AUDIO_WAV", "false").lower() in ("1", "true", "yes")  # keep the extracted track
+    SAVE_FRAMES: bool = os.getenv("SAVE_FRAMES", "false").lower() in ("1", "true", "yes")  # write sampled frames as JPEG
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")  # DEBUG / INFO / WARNING / ERROR for the app.* loggers
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,35 @@
+import logging
+import sys
+
+from app.utils.config import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+_configured = False
+
+
+def setup_logging(level: str = None) -> None:
+    """
+    Configure the "app" logger tree from Settings.LOG_LEVEL.
+    Runs once per process (job workers are spawned, so they configure themselves on import).
+    """
+    global _configured
+    root = logging.getLogger("app")
+    name = (level or settings.LOG_LEVEL or "INFO").upper()
+    root.setLevel(getattr(logging, name, logging.INFO))
+    if _configured:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(handler)
+    root.propagate = False  # uvicorn configures the root logger with its own format
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger under the "app" tree; pass __name__."""
+    setup_logging()
+    if name != "app" and not name.startswith("app."):
+        name = f"app.{name}"
+    return logging.getLogger(name)
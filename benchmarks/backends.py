@@ -0,0 +1,85 @@
+"""
+CPU inference backend benchmark and parity check.
+
+Loads the classifier once, wraps it in each backend from app/ml_core/backends.py
+and reports images per second per intra-op thread plus the largest score
+difference against eager PyTorch on the same inputs.
+
+Usage:
+    python benchmarks/backends.py [--model umarbutler/deepfake-detection] [--threads 1]
+                                  [--batch 16] [--seconds 5] [--images DIR]
+
+Without --images the deterministic synthetic parity images are used.
+Exits non-zero if a backend exceeds MODEL_PARITY_TOL.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from app.ml_core.backends import BACKENDS, TorchBackend, build_backend, parity_diff, parity_images  # noqa: E402
+from app.ml_core.hf_model import HF_MODEL  # noqa: E402
+from app.utils.config import settings  # noqa: E402
+
+
+def load_images(folder: str, limit: int) -> list:
+    names = sorted(n for n in os.listdir(folder) if n.lower().endswith((".jpg", ".jpeg", ".png")))
+    return [Image.open(os.path.join(folder, n)).convert("RGB") for n in names[:limit]]
+
+
+def throughput(backend, images, batch: int, seconds: float) -> float:
+    backend.predict(images[:batch])  # warmup
+    done = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for start in range(0, len(images), batch):
+            backend.predict(images[start:start + batch])
+        done += len(images)
+    return done / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=HF_MODEL, help="hub id or local directory")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--images", default=None, help="folder of JPEG/PNG images")
+    args = parser.parse_args()
+
+    from transformers import AutoModelForImageClassification, AutoImageProcessor
+
+    processor = AutoImageProcessor.from_pretrained(args.model)
+    model = AutoModelForImageClassification.from_pretrained(args.model).eval()
+    images = load_images(args.images, 64) if args.images else parity_images(32)
+
+    reference = TorchBackend(processor, model, threads=args.threads)
+    report, failed = {}, False
+    for name in args.backends.split(","):
+        backend = build_backend(name, processor, model, args.model, threads=args.threads)
+        fps = throughput(backend, images, args.batch, args.seconds)
+        diff = parity_diff(reference, backend, images)
+        failed |= diff > settings.MODEL_PARITY_TOL
+        report[name] = {
+            "images_per_sec_per_thread": round(fps / args.threads, 2),
+            "parity_max_diff": round(diff, 5),
+        }
+
+    base = report.get("torch", {}).get("images_per_sec_per_thread")
+    if base:
+        for row in report.values():
+            row["speedup_vs_torch"] = round(row["images_per_sec_per_thread"] / base, 2)
+
+    print(json.dumps({"model": args.model, "threads": args.threads, "batch": args.batch,
+                      "tolerance": settings.MODEL_PARITY_TOL, "backends": report}, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Analysis pipeline benchmark on synthetic media.
+
+Generates a video (cv2.VideoWriter, muxed with a synthetic audio track when
+ffmpeg is available), a WAV file and JPEG images, then times each stage:
+
+    extract_frames            – decode + save frames at --fps        (per run)
+    extract_audio_from_video  – ffmpeg to 16 kHz WAV                 (per run)
+    predict_frame             – remote scorer (stubbed HF API) + fallback (per image)
+    heuristic_predict         – Laplacian-variance fallback          (per image)
+    detect_face_presence      – Haar cascade                         (per image)
+    create_heatmap_from_scores                                       (per run)
+    analyze_audio_features    – librosa features of the WAV          (per run)
+    run_full_pipeline         – the whole video job, DB write included (per run)
+
+Nothing touches the network: the HF Inference API client and the local
+model are replaced by deterministic stubs with a configurable latency, and
+the database, uploads and caches live in a temporary directory.
+
+Each stage reports p50/p95/mean latency, items per second and the process
+peak RSS once the stage has run (a high-water mark, so it only grows).
+
+Usage:
+    python benchmarks/pipeline.py [--seconds 20] [--width 1280 --height 720] [--video-fps 25]
+                                  [--fps 1] [--images 32] [--repeat 3] [--scorer remote|local]
+                                  [--api-latency-ms 0] [--model-latency-ms 0]
+                                  [--stages extract_frames,...] [--output run.json]
+                                  [--baseline baseline.json] [--max-regression 0.2]
+
+With --baseline, each stage's p50 is compared against the stored run and the
+script exits non-zero if any stage is slower by more than --max-regression.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = (
+    "extract_frames",
+    "extract_audio_from_video",
+    "predict_frame",
+    "heuristic_predict",
+    "detect_face_presence",
+    "create_heatmap_from_scores",
+    "analyze_audio_features",
+    "run_full_pipeline",
+)
+
+
+# ------------------------------
+# SYNTHETIC MEDIA
+# ------------------------------
+def synthetic_frame(i: int, width: int, height: int, rng) -> np.ndarray:
+    """A moving gradient, a drifting 'face' ellipse and light noise, so consecutive frames differ."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    shift = (i * 7) % 256
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = ((x + shift) % 256).astype(np.uint8)
+    frame[..., 1] = np.linspace(40, 200, height, dtype=np.float32)[:, None].astype(np.uint8)
+    frame[..., 2] = (255 - frame[..., 0]) // 2
+
+    cx = int(width * (0.3 + 0.4 * (0.5 + 0.5 * np.sin(i / 15))))
+    cy, axes = height // 2, (max(width // 10, 4), max(height // 6, 4))
+    cv2.ellipse(frame, (cx, cy), axes, 0, 0, 360, (140, 170, 210), -1)
+    cv2.circle(frame, (cx - axes[0] // 3, cy - axes[1] // 4), max(axes[0] // 8, 1), (30, 30, 30), -1)
+    cv2.circle(frame, (cx + axes[0] // 3, cy - axes[1] // 4), max(axes[0] // 8, 1), (30, 30, 30), -1)
+
+    noise = rng.integers(-12, 13, frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def write_video(path: str, seconds: float, fps: int, width: int, height: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError("cv2.VideoWriter could not open an mp4v writer")
+    for i in range(int(seconds * fps)):
+        writer.write(synthetic_frame(i, width, height, rng))
+    writer.release()
+    return path
+
+
+def write_wav(path: str, seconds: float, sr: int = 16000, seed: int = 0) -> str:
+    """Mono 16-bit speech-like signal: a wobbling tone with syllable-rate bursts and noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 0.5 * t)) * t)
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    y = 0.3 * tone * envelope + 0.02 * rng.standard_normal(len(t))
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sr)
+        f.writeframes((np.clip(y, -1, 1) * 32767).astype("<i2").tobytes())
+    return path
+
+
+def mux_audio(video_path: str, wav_path: str, out_path: str):
+    """Video + WAV → MP4 with an AAC track. None if ffmpeg is missing or fails."""
+    if shutil.which("ffmpeg") is None:
+        return None
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", video_path, "-i", wav_path,
+           "-c:v", "copy", "-c:a", "aac", "-shortest", out_path]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return out_path if result.returncode == 0 else None
+
+
+def write_images(folder: str, count: int, width: int, height: int, seed: int = 1) -> list:
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"image_{i:04d}.jpg")
+        cv2.imwrite(path, synthetic_frame(i * 11, width, height, rng))
+        paths.append(path)
+    return paths
+
+
+# ------------------------------
+# STUBS
+# ------------------------------
+def _stub_score(mean: float) -> float:
+    # Deterministic pseudo-probability from the image brightness
+    return round(0.15 + 0.7 * ((mean * 37) % 255) / 255, 4)
+
+
+class StubBackend:
+    """Stands in for the local classifier; same predict() contract as app/ml_core/backends.py."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.info = {"backend": "stub", "latency_ms": latency_ms}
+
+    def predict(self, pil_images) -> list:
+        if self.latency:
+            time.sleep(self.latency * len(pil_images))
+        return [_stub_score(float(np.asarray(img).mean())) for img in pil_images]
+
+
+def install_stubs(api_latency_ms: float, model_latency_ms: float):
+    """Route the HF API client and the local model registry to offline stubs."""
+    from app.ml_core import hf_model
+    from app.ml_core.remote import remote_client
+
+    def score_bytes(img_bytes):
+        if api_latency_ms:
+            time.sleep(api_latency_ms / 1000)
+        img = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        return _stub_score(float(img.mean())) if img is not None else None
+
+    remote_client.score_bytes = score_bytes
+    hf_model.model_registry.register(hf_model.HF_MODEL, lambda: StubBackend(model_latency_ms))
+
+
+# ------------------------------
+# MEASUREMENT
+# ------------------------------
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    low, high = int(pos), min(int(pos) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(latencies: list, items: int) -> dict:
+    """latencies: seconds per call; items: units of work (frames, images) across all calls."""
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "p50_ms": round(1000 * percentile(latencies, 0.5), 3),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 3),
+        "mean_ms": round(1000 * statistics.mean(latencies), 3),
+        "items_per_sec": round(items / total, 2) if total else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+# ------------------------------
+# STAGES
+# ------------------------------
+def run_stages(names, media: dict, args, work: str) -> dict:
+    from app.ml_core.frames import extract_frames
+    from app.ml_core.audio import extract_audio_from_video
+    from app.ml_core.detectors import predict_frame, heuristic_predict, detect_face_presence
+    from app.ml_core.heatmap import create_heatmap_from_scores
+    from app.utils.audio_utils import analyze_audio_features
+    from app.routes.analyze import run_full_pipeline, sampling_options
+    from app.models.db import init_db
+
+    video = media["video_with_audio"] or media["video"]
+    images = [cv2.imread(p) for p in media["images"]]
+    results = {}
+
+    for name in names:
+        latencies, items = [], 0
+
+        if name == "extract_frames":
+            for r in range(args.repeat):
+                out = os.path.join(work, f"frames_{r}")
+                seconds, frames = timed(extract_frames, video, out, args.fps)
+                latencies.append(seconds)
+                items += len(frames)
+
+        elif name == "extract_audio_from_video":
+            if media["video_with_audio"] is None:
+                results[name] = {"skipped": "no ffmpeg, video has no audio track"}
+                continue
+            for r in range(args.repeat):
+                seconds, wav = timed(extract_audio_from_video, video, os.path.join(work, f"extracted_{r}.wav"))
+                latencies.append(seconds)
+                items += 1 if wav else 0
+
+        elif name in ("predict_frame", "heuristic_predict", "detect_face_presence"):
+            fn = {"predict_frame": predict_frame, "heuristic_predict": heuristic_predict,
+                  "detect_face_presence": detect_face_presence}[name]
+            fn(images[0])  # warmup (cascade load, first JPEG encode)
+            for _ in range(args.repeat):
+                for img in images:
+                    latencies.append(timed(fn, img)[0])
+                    items += 1
+
+        elif name == "create_heatmap_from_scores":
+            count = max(1, int(args.seconds * args.fps))
+            scores = [_stub_score(i * 13.0) for i in range(count)]
+            paths = [f"frame_{i:05d}.jpg" for i in range(count)]
+            for r in range(args.repeat):
+                latencies.append(timed(create_heatmap_from_scores, paths, scores,
+                                       os.path.join(work, f"heatmap_{r}.jpg"))[0])
+                items += count
+
+        elif name == "analyze_audio_features":
+            for _ in range(args.repeat):
+                seconds, features = timed(analyze_audio_features, media["wav"])
+                if "error" in features:
+                    raise RuntimeError(f"analyze_audio_features failed: {features}")
+                latencies.append(seconds)
+                items += 1
+
+        elif name == "run_full_pipeline":
+            init_db()
+            sampling = sampling_options(fps=args.fps)
+            for r in range(args.repeat):
+                # Fresh copy per run: the pipeline writes frames and heatmaps next to the input
+                path = os.path.join(work, f"pipeline_{r}.mp4")
+                shutil.copyfile(video, path)
+                seconds, scan_id = timed(run_full_pipeline, path, None, os.path.basename(path), None, sampling)
+                if scan_id is None:
+                    raise RuntimeError("run_full_pipeline produced no scan")
+                latencies.append(seconds)
+                items += int(args.seconds * args.fps)
+
+        else:
+            raise ValueError(f"Unknown stage: {name}")
+
+        results[name] = summarize(latencies, items)
+        print(f"[BENCH] {name}: p50 {results[name]['p50_ms']} ms, "
+              f"{results[name]['items_per_sec']} items/s", file=sys.stderr)
+
+    return results
+
+
+# ------------------------------
+# BASELINE COMPARISON
+# ------------------------------
+def compare(current: dict, baseline: dict, max_regression: float) -> dict:
+    """Per-stage p50 ratio current/baseline; a ratio above 1 + max_regression is a regression."""
+    comparison = {}
+    for name, stats in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or "p50_ms" not in before or "p50_ms" not in stats or not before["p50_ms"]:
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"]
+        comparison[name] = {
+            "baseline_p50_ms": before["p50_ms"],
+            "p50_ms": stats["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + max_regression,
+        }
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20, help="length of the synthetic video and WAV")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--video-fps", type=int, default=25)
+    parser.add_argument("--fps", type=float, default=1, help="frame sampling rate for the pipeline")
+    parser.add_argument("--images", type=int, default=32, help="images for the per-image stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scorer", choices=("remote", "local"), default="remote", help="VIDEO_SCORER for the pipeline")
+    parser.add_argument("--api-latency-ms", type=float, default=0, help="simulated HF API round trip")
+    parser.add_argument("--model-latency-ms", type=float, default=0, help="simulated local model time per image")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--output", default=None, help="write the JSON report here (e.g. to store a baseline)")
+    parser.add_argument("--baseline", default=None, help="earlier --output file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p50 slowdown, 0.2 = 20%%")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary work directory")
+    args = parser.parse_args()
+
+    names = [n for n in args.stages.split(",") if n]
+    unknown = set(names) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    work = tempfile.mkdtemp(prefix="deepfake-bench-")
+    # Settings are read at import, so point the app at the work directory first
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(work, 'bench.db')}",
+        "UPLOAD_DIR": os.path.join(work, "uploads"),
+        # Never read or fill the developer's result cache or job event logs
+        "RESULT_CACHE_DIR": os.path.join(work, "result_cache"),
+        "JOB_EVENTS_DIR": os.path.join(work, "jobs"),
+        "VIDEO_SCORER": args.scorer,
+        "MODEL_PRELOAD": "lazy",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "FRAME_DEDUP_GLOBAL_SIZE": "0",  # repeated runs must not reuse each other's scores
+    })
+
+    try:
+        t0 = time.perf_counter()
+        video = write_video(os.path.join(work, "synthetic.mp4"), args.seconds, args.video_fps, args.width, args.height)
+        wav = write_wav(os.path.join(work, "synthetic.wav"), args.seconds)
+        media = {
+            "video": video,
+            "wav": wav,
+            "video_with_audio": mux_audio(video, wav, os.path.join(work, "synthetic_av.mp4")),
+            "images": write_images(os.path.join(work, "images"), args.images, args.width, args.height),
+        }
+        generate_seconds = time.perf_counter() - t0
+
+        # Keep stdout for the JSON report (app logs already go to stderr)
+        with contextlib.redirect_stdout(sys.stderr):
+            install_stubs(args.api_latency_ms, args.model_latency_ms)
+            stages = run_stages(names, media, args, work)
+
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "keep")},
+            "media": {
+                "has_audio_track": media["video_with_audio"] is not None,
+                "video_frames": int(args.seconds * args.video_fps),
+                "generate_seconds": round(generate_seconds, 3),
+            },
+            "stages": stages,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+        failed = False
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["comparison"] = compare(report, json.load(f), args.max_regression)
+            failed = any(row["regression"] for row in report["comparison"].values())
+
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        print(text)
+        sys.exit(1 if failed else 0)
+    finally:
+        if args.keep:
+            print(f"[BENCH] Work directory kept at {work}", file=sys.stderr)
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
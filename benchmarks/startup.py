@@ -0,0 +1,103 @@
+"""
+Cold-start benchmark.
+
+Measures, from a fresh interpreter:
+    import   – `import app.main` (route modules, settings, no model weights)
+    health   – uvicorn spawned until GET /health answers
+    ready    – uvicorn spawned until GET /ready returns 200 (models loaded and warmed)
+
+Usage:
+    python benchmarks/startup.py [--runs 3] [--port 8765] [--preload background|blocking|lazy]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(env) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def time_server(env, port: int, timeout: float) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {"health": None, "ready": None, "models": None}
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                if result["health"] is None and requests.get(f"{base}/health", timeout=1).ok:
+                    result["health"] = time.perf_counter() - t0
+                if result["health"] is not None:
+                    r = requests.get(f"{base}/ready", timeout=1)
+                    if r.status_code == 200:
+                        result["ready"] = time.perf_counter() - t0
+                        result["models"] = r.json().get("models")
+                        break
+                    if any(m["state"] == "failed" for m in r.json().get("models", {}).values()):
+                        result["models"] = r.json().get("models")
+                        break
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def _summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"median": round(statistics.median(values), 3), "min": round(min(values), 3), "max": round(max(values), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--preload", default=None, help="override MODEL_PRELOAD")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.preload:
+        env["MODEL_PRELOAD"] = args.preload
+
+    imports, health, ready, models = [], [], [], None
+    for _ in range(args.runs):
+        imports.append(time_import(env))
+        run = time_server(env, args.port, args.timeout)
+        health.append(run["health"])
+        ready.append(run["ready"])
+        models = run["models"]
+
+    print(json.dumps({
+        "preload": env.get("MODEL_PRELOAD", "background"),
+        "runs": args.runs,
+        "import_seconds": _summary(imports),
+        "health_seconds": _summary(health),
+        "ready_seconds": _summary(ready),
+        "models": models,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()